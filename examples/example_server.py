@@ -23,8 +23,10 @@ Run:
 """
 
 import asyncio
-import json
+import io
+import math
 import os
+from collections.abc import Callable
 from pathlib import Path
 
 from mcp.server import NotificationOptions, Server
@@ -47,11 +49,25 @@ from mcpstat import (
     generate_stats_prompt,
 )
 
+try:  # orjson is optional - noticeably faster for the small payloads below
+    import orjson
+
+    def _dumps(obj: object, *, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+except ImportError:
+    import json
+
+    def _dumps(obj: object, *, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
+
 # =============================================================================
 # Setup
 # =============================================================================
 
 _HERE = Path(__file__).parent
+_TRUTHY = frozenset({"true", "1", "yes", "on"})
 
 app = Server("example-server")
 
@@ -60,7 +76,7 @@ stat = MCPStat(
     "example-server",
     db_path=str(_HERE / "example_stats.sqlite"),
     log_path=str(_HERE / "example_stats.log"),
-    log_enabled=os.getenv("MCPSTAT_LOG_ENABLED", "false").lower() in ("true", "1", "yes"),
+    log_enabled=os.getenv("MCPSTAT_LOG_ENABLED", "").lower() in _TRUTHY,
     metadata_presets={
         "celsius_to_fahrenheit": {
             "tags": ["temperature", "conversion", "math"],
@@ -93,54 +109,81 @@ README_PATH = _HERE.parent / "README.md"
 # =============================================================================
 
 
-def _build_tool_list() -> list[Tool]:
-    """Build the list of available tools."""
-    # Custom tools
-    custom_tools = [
-        Tool(
-            name="celsius_to_fahrenheit",
-            description="Convert temperature from Celsius to Fahrenheit",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "celsius": {"type": "number", "description": "Temperature in Celsius"},
-                },
-                "required": ["celsius"],
-            },
-        ),
-        Tool(
-            name="fahrenheit_to_celsius",
-            description="Convert temperature from Fahrenheit to Celsius",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "fahrenheit": {"type": "number", "description": "Temperature in Fahrenheit"},
-                },
-                "required": ["fahrenheit"],
-            },
-        ),
-    ]
-
-    # Built-in stats tools from mcpstat
-    stats_tool_defs = build_tool_definitions(prefix="get", server_name="example-server")
-    stats_tools = [
-        Tool(
-            name=t["name"],
-            description=t["description"],
-            inputSchema=t["inputSchema"],
-        )
-        for t in stats_tool_defs
-    ]
+def _text(payload: str) -> list[TextContent]:
+    """Wrap a payload as tool content (model_construct skips pydantic validation)."""
+    return [TextContent.model_construct(type="text", text=payload)]
 
-    return custom_tools + stats_tools
+
+# Input schemas are constants shared by the Tool models. Plain dicts rather than
+# MappingProxyType: pydantic cannot serialize nested read-only mappings.
+_CELSIUS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "celsius": {"type": "number", "description": "Temperature in Celsius"},
+    },
+    "required": ["celsius"],
+}
+_FAHRENHEIT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "fahrenheit": {"type": "number", "description": "Temperature in Fahrenheit"},
+    },
+    "required": ["fahrenheit"],
+}
+
+# Custom tools - built once, the definitions never change at runtime
+_CUSTOM_TOOLS = (
+    Tool(
+        name="celsius_to_fahrenheit",
+        description="Convert temperature from Celsius to Fahrenheit",
+        inputSchema=_CELSIUS_SCHEMA,
+    ),
+    Tool(
+        name="fahrenheit_to_celsius",
+        description="Convert temperature from Fahrenheit to Celsius",
+        inputSchema=_FAHRENHEIT_SCHEMA,
+    ),
+)
+
+# Built-in stats tools from mcpstat
+_STATS_TOOLS = tuple(
+    Tool(**t) for t in build_tool_definitions(prefix="get", server_name="example-server")
+)
+
+# Full tool list - built once, list_tools is called on every discovery request
+_TOOLS = [*_CUSTOM_TOOLS, *_STATS_TOOLS]
 
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
-    tools = _build_tool_list()
-    await stat.sync_tools(tools)
-    return tools
+    await _sync_metadata()
+    return _TOOLS
+
+
+# Fixed two-number payloads are formatted directly; anything that is not a
+# plain finite int/float (bool, NaN, inf) goes through the JSON encoder.
+def _celsius_to_fahrenheit(arguments: dict) -> list[TextContent]:
+    c = arguments.get("celsius", 0)
+    f = round(c * 1.8 + 32, 2)
+    if type(c) in (int, float) and math.isfinite(f):
+        return _text(f'{{"celsius":{c},"fahrenheit":{f}}}')
+    return _text(_dumps({"celsius": c, "fahrenheit": f}))
+
+
+def _fahrenheit_to_celsius(arguments: dict) -> list[TextContent]:
+    f = arguments.get("fahrenheit", 0)
+    c = round((f - 32) * 0.5555555555555556, 2)  # 5 / 9
+    if type(f) in (int, float) and math.isfinite(c):
+        return _text(f'{{"fahrenheit":{f},"celsius":{c}}}')
+    return _text(_dumps({"fahrenheit": f, "celsius": c}))
+
+
+# Custom tool handlers, dispatched by name
+_DISPATCH: dict[str, Callable[[dict], list[TextContent]]] = {
+    "celsius_to_fahrenheit": _celsius_to_fahrenheit,
+    "fahrenheit_to_celsius": _fahrenheit_to_celsius,
+}
 
 
 @app.call_tool()
@@ -150,31 +193,15 @@ async def handle_tool(name: str, arguments: dict) -> list[TextContent]:
     # Handle built-in stats tools
     if stats_handler.is_stats_tool(name):
         result = await stats_handler.handle(name, arguments)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return _text(_dumps(result, indent=True))
 
     # Custom tools
-    if name == "celsius_to_fahrenheit":
-        c = arguments.get("celsius", 0)
-        f = (c * 9 / 5) + 32
-        return [
-            TextContent(
-                type="text",
-                text=json.dumps({"celsius": c, "fahrenheit": round(f, 2)}),
-            )
-        ]
-
-    if name == "fahrenheit_to_celsius":
-        f = arguments.get("fahrenheit", 0)
-        c = (f - 32) * 5 / 9
-        return [
-            TextContent(
-                type="text",
-                text=json.dumps({"fahrenheit": f, "celsius": round(c, 2)}),
-            )
-        ]
+    handler = _DISPATCH.get(name)
+    if handler is not None:
+        return handler(arguments)
 
-    # Unknown tool (still tracked above)
-    return [TextContent(type="text", text=json.dumps({"error": f"Unknown tool: {name}"}))]
+    # Unknown tool (only counted by stat.track once the tool list is synced)
+    return _text(_dumps({"error": f"Unknown tool: {name}"}))
 
 
 # =============================================================================
@@ -182,25 +209,47 @@ async def handle_tool(name: str, arguments: dict) -> list[TextContent]:
 # =============================================================================
 
 
+_RESOURCES = [
+    Resource(
+        uri="resource://example-server/readme",
+        name="README.md",
+        description="mcpstat package documentation and usage guide",
+        mimeType="text/markdown",
+    ),
+    Resource(
+        uri="resource://example-server/tool-catalog",
+        name="Tool Catalog",
+        description="Tag-indexed tool catalog with usage statistics",
+        mimeType="text/markdown",
+    ),
+]
+
+
 @app.list_resources()
 async def list_resources() -> list[Resource]:
     """List available resources."""
-    resources = [
-        Resource(
-            uri="resource://example-server/readme",
-            name="README.md",
-            description="mcpstat package documentation and usage guide",
-            mimeType="text/markdown",
-        ),
-        Resource(
-            uri="resource://example-server/tool-catalog",
-            name="Tool Catalog",
-            description="Tag-indexed tool catalog with usage statistics",
-            mimeType="text/markdown",
-        ),
-    ]
-    await stat.sync_resources(resources)
-    return resources
+    await _sync_metadata()
+    return _RESOURCES
+
+
+_README_TEXT: str | None = None
+_README_MISSING = "# README not found\n\nThe README.md file was not found at the expected location."
+
+
+def _load_readme() -> str:
+    """Read README.md from disk (blocking - run via asyncio.to_thread)."""
+    try:
+        return README_PATH.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return _README_MISSING
+
+
+async def _readme() -> str:
+    """Return README.md, loading it off the event loop on first access."""
+    global _README_TEXT
+    if _README_TEXT is None:
+        _README_TEXT = await asyncio.to_thread(_load_readme)
+    return _README_TEXT
 
 
 @app.read_resource()
@@ -209,37 +258,34 @@ async def read_resource(uri: str) -> str:
     # Extract resource name for tracking
     # Convert AnyUrl to string if needed (MCP SDK may pass AnyUrl instead of str)
     uri_str = str(uri)
-    resource_name = uri_str.split("/")[-1] if "/" in uri_str else uri_str
+    resource_name = uri_str.rpartition("/")[2] or uri_str
 
     # Use tracking() context manager when you need to compute the name first
     async with stat.tracking(resource_name, "resource"):
         if uri_str == "resource://example-server/readme":
-            if README_PATH.exists():
-                return README_PATH.read_text(encoding="utf-8")
-            return (
-                "# README not found\n\nThe README.md file was not found at the expected location."
-            )
+            return await _readme()
 
         if uri_str == "resource://example-server/tool-catalog":
             catalog = await stat.get_catalog(include_usage=True)
-            lines = [
-                "# Tool Catalog",
-                "",
-                f"**Total tools:** {catalog['total_tracked']}",
-                f"**Available tags:** {', '.join(catalog.get('all_tags', []))}",
-                "",
-                "## Tools",
-                "",
-            ]
+            all_tags = ", ".join(catalog["all_tags"])
+            buf = io.StringIO()
+            w = buf.write
+            w(
+                "# Tool Catalog\n\n"
+                f"**Total tools:** {catalog['total_tracked']}\n"
+                f"**Available tags:** {all_tags}\n\n"
+                "## Tools\n\n"
+            )
+            # get_catalog always fills these keys, so index instead of .get()
             for entry in catalog["results"]:
-                tags = ", ".join(entry.get("tags", [])) or "(no tags)"
-                calls = entry.get("call_count", 0)
-                lines.append(f"### `{entry['name']}`")
-                lines.append(entry.get("short_description", ""))
-                lines.append(f"- **Tags:** {tags}")
-                lines.append(f"- **Calls:** {calls}")
-                lines.append("")
-            return "\n".join(lines)
+                tags = ", ".join(entry["tags"]) or "(no tags)"
+                w(
+                    f"### `{entry['name']}`\n"
+                    f"{entry['short_description']}\n"
+                    f"- **Tags:** {tags}\n"
+                    f"- **Calls:** {entry['call_count']}\n\n"
+                )
+            return buf.getvalue()
 
         raise ValueError(f"Unknown resource: {uri_str}")
 
@@ -249,29 +295,31 @@ async def read_resource(uri: str) -> str:
 # =============================================================================
 
 
+_PROMPTS = [
+    Prompt(
+        name="usage_stats",
+        description="Generate MCP usage statistics summary for tools, resources, and prompts",
+        arguments=[
+            PromptArgument(
+                name="period",
+                description="Time period (e.g., 'today', 'past week', 'all time')",
+                required=False,
+            ),
+            PromptArgument(
+                name="type",
+                description="Filter by type: 'all', 'tool', 'resource', 'prompt'",
+                required=False,
+            ),
+        ],
+    ),
+]
+
+
 @app.list_prompts()
 async def list_prompts() -> list[Prompt]:
     """List available prompts."""
-    prompts = [
-        Prompt(
-            name="usage_stats",
-            description="Generate MCP usage statistics summary for tools, resources, and prompts",
-            arguments=[
-                PromptArgument(
-                    name="period",
-                    description="Time period (e.g., 'today', 'past week', 'all time')",
-                    required=False,
-                ),
-                PromptArgument(
-                    name="type",
-                    description="Filter by type: 'all', 'tool', 'resource', 'prompt'",
-                    required=False,
-                ),
-            ],
-        ),
-    ]
-    await stat.sync_prompts(prompts)
-    return prompts
+    await _sync_metadata()
+    return _PROMPTS
 
 
 @app.get_prompt()
@@ -297,7 +345,7 @@ async def get_prompt(name: str, arguments: dict | None = None) -> GetPromptResul
             messages=[
                 PromptMessage(
                     role="user",
-                    content=TextContent(type="text", text=prompt_text),
+                    content=TextContent.model_construct(type="text", text=prompt_text),
                 )
             ],
         )
@@ -305,6 +353,21 @@ async def get_prompt(name: str, arguments: dict | None = None) -> GetPromptResul
     raise ValueError(f"Unknown prompt: {name}")
 
 
+# =============================================================================
+# Metadata sync
+# =============================================================================
+
+_METADATA_SYNCED = False
+
+
+async def _sync_metadata() -> None:
+    """Sync tool, resource, and prompt metadata once, in a single transaction."""
+    global _METADATA_SYNCED
+    if not _METADATA_SYNCED:
+        await stat.sync_all(tools=_TOOLS, resources=_RESOURCES, prompts=_PROMPTS)
+        _METADATA_SYNCED = True
+
+
 # =============================================================================
 # Run
 # =============================================================================
@@ -312,20 +375,29 @@ async def get_prompt(name: str, arguments: dict | None = None) -> GetPromptResul
 
 async def main():
     """Main entry point."""
-    async with stdio_server() as (read, write):
-        await app.run(
-            read,
-            write,
-            InitializationOptions(
-                server_name="example-server",
-                server_version="1.0.0",
-                capabilities=app.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read, write):
+            await app.run(
+                read,
+                write,
+                InitializationOptions(
+                    server_name="example-server",
+                    server_version="1.0.0",
+                    capabilities=app.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        # Write any batched usage records before exiting
+        await stat.flush()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:  # uvloop is optional (mcpstat[fast]) - a faster event loop on Linux/macOS
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
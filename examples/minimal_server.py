@@ -19,7 +19,8 @@ Run:
 """
 
 import asyncio
-import json
+import math
+from collections.abc import Callable
 
 from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
@@ -28,6 +29,17 @@ from mcp.types import TextContent, Tool
 
 from mcpstat import MCPStat
 
+try:  # orjson is optional - noticeably faster for the small payloads below
+    import orjson
+
+    def _dumps(obj: object) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+    import json
+
+    _dumps = json.dumps
+
 # =============================================================================
 # Setup - Just 2 lines!
 # =============================================================================
@@ -41,54 +53,80 @@ stat = MCPStat("temp-converter")  # That's it!
 # =============================================================================
 
 
+def _text(payload: str) -> list[TextContent]:
+    """Wrap a payload as tool content (model_construct skips pydantic validation)."""
+    return [TextContent.model_construct(type="text", text=payload)]
+
+
+# Shared error response - the MCP server copies the content list, never mutates it
+_UNKNOWN_TOOL_RESPONSE = _text(_dumps({"error": "Unknown tool"}))
+
+
+_CELSIUS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "celsius": {"type": "number", "description": "Temperature in Celsius"},
+    },
+    "required": ["celsius"],
+}
+_FAHRENHEIT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "fahrenheit": {"type": "number", "description": "Temperature in Fahrenheit"},
+    },
+    "required": ["fahrenheit"],
+}
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     tools = [
         Tool(
             name="celsius_to_fahrenheit",
             description="Convert temperature from Celsius to Fahrenheit",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "celsius": {"type": "number", "description": "Temperature in Celsius"},
-                },
-                "required": ["celsius"],
-            },
+            inputSchema=_CELSIUS_SCHEMA,
         ),
         Tool(
             name="fahrenheit_to_celsius",
             description="Convert temperature from Fahrenheit to Celsius",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "fahrenheit": {"type": "number", "description": "Temperature in Fahrenheit"},
-                },
-                "required": ["fahrenheit"],
-            },
+            inputSchema=_FAHRENHEIT_SCHEMA,
         ),
     ]
     await stat.sync_tools(tools)  # Optional: enables catalog queries
     return tools
 
 
+# Fixed two-number payloads are formatted directly; anything that is not a
+# plain finite int/float (bool, NaN, inf) goes through the JSON encoder.
+def _celsius_to_fahrenheit(arguments: dict) -> list[TextContent]:
+    c = arguments.get("celsius", 0)
+    f = round(c * 1.8 + 32, 2)
+    if type(c) in (int, float) and math.isfinite(f):
+        return _text(f'{{"celsius":{c},"fahrenheit":{f}}}')
+    return _text(_dumps({"celsius": c, "fahrenheit": f}))
+
+
+def _fahrenheit_to_celsius(arguments: dict) -> list[TextContent]:
+    f = arguments.get("fahrenheit", 0)
+    c = round((f - 32) * 0.5555555555555556, 2)  # 5 / 9
+    if type(f) in (int, float) and math.isfinite(c):
+        return _text(f'{{"fahrenheit":{f},"celsius":{c}}}')
+    return _text(_dumps({"fahrenheit": f, "celsius": c}))
+
+
+_DISPATCH: dict[str, Callable[[dict], list[TextContent]]] = {
+    "celsius_to_fahrenheit": _celsius_to_fahrenheit,
+    "fahrenheit_to_celsius": _fahrenheit_to_celsius,
+}
+
+
 @app.call_tool()
 @stat.track  # ← One decorator: tracks usage + latency automatically!
 async def handle_tool(name: str, arguments: dict) -> list[TextContent]:
-    if name == "celsius_to_fahrenheit":
-        c = arguments.get("celsius", 0)
-        f = (c * 9 / 5) + 32
-        return [
-            TextContent(type="text", text=json.dumps({"celsius": c, "fahrenheit": round(f, 2)}))
-        ]
-
-    if name == "fahrenheit_to_celsius":
-        f = arguments.get("fahrenheit", 0)
-        c = (f - 32) * 5 / 9
-        return [
-            TextContent(type="text", text=json.dumps({"fahrenheit": f, "celsius": round(c, 2)}))
-        ]
-
-    return [TextContent(type="text", text=json.dumps({"error": "Unknown tool"}))]
+    handler = _DISPATCH.get(name)
+    if handler is not None:
+        return handler(arguments)
+    return _UNKNOWN_TOOL_RESPONSE
 
 
 # =============================================================================
@@ -97,20 +135,29 @@ async def handle_tool(name: str, arguments: dict) -> list[TextContent]:
 
 
 async def main():
-    async with stdio_server() as (read, write):
-        await app.run(
-            read,
-            write,
-            InitializationOptions(
-                server_name="temp-converter",
-                server_version="1.0.0",
-                capabilities=app.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read, write):
+            await app.run(
+                read,
+                write,
+                InitializationOptions(
+                    server_name="temp-converter",
+                    server_version="1.0.0",
+                    capabilities=app.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        # Write any batched usage records before exiting
+        await stat.flush()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:  # uvloop is optional (mcpstat[fast]) - a faster event loop on Linux/macOS
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
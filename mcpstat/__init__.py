@@ -63,12 +63,30 @@ __version__ = "0.2.2"
 __author__ = "Vadim Bakhrenkov"
 __license__ = "MIT"
 
-from mcpstat.core import MCPStat
-from mcpstat.database import MCPStatDatabase
-from mcpstat.logging import MCPStatLogger
-from mcpstat.prompts import build_prompt_definition, generate_stats_prompt
-from mcpstat.tools import BuiltinToolsHandler, build_tool_definitions
-from mcpstat.utils import derive_short_description, normalize_tags
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from mcpstat.core import MCPStat
+    from mcpstat.database import MCPStatDatabase
+    from mcpstat.logging import MCPStatLogger
+    from mcpstat.prompts import build_prompt_definition, generate_stats_prompt
+    from mcpstat.tools import BuiltinToolsHandler, build_tool_definitions
+    from mcpstat.utils import derive_short_description, normalize_tags
+
+# Public names are imported on first access (PEP 562), so `from mcpstat
+# import MCPStat` does not load the prompts/tools modules
+_LAZY_IMPORTS = {
+    "MCPStat": "mcpstat.core",
+    "MCPStatDatabase": "mcpstat.database",
+    "MCPStatLogger": "mcpstat.logging",
+    "build_prompt_definition": "mcpstat.prompts",
+    "generate_stats_prompt": "mcpstat.prompts",
+    "BuiltinToolsHandler": "mcpstat.tools",
+    "build_tool_definitions": "mcpstat.tools",
+    "derive_short_description": "mcpstat.utils",
+    "normalize_tags": "mcpstat.utils",
+}
 
 __all__ = [
     "BuiltinToolsHandler",
@@ -82,3 +100,18 @@ __all__ = [
     "generate_stats_prompt",
     "normalize_tags",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve public names lazily and cache them in the module namespace."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_IMPORTS})
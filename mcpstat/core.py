@@ -13,20 +13,25 @@ All configuration is passed at initialization time.
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import functools
+import itertools
 import os
 import sys
 import time
+import weakref
+from collections import deque
 from contextlib import asynccontextmanager
+from time import perf_counter_ns
 from typing import TYPE_CHECKING, Any
 
-from mcpstat.database import MCPStatDatabase
+from mcpstat.database import MCPStatDatabase, UsageRecord
 from mcpstat.logging import MCPStatLogger
 from mcpstat.utils import derive_short_description, normalize_tags
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator, Awaitable, Callable
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
     from typing import Literal, ParamSpec, TypeVar
 
     P = ParamSpec("P")
@@ -36,6 +41,40 @@ if TYPE_CHECKING:
 DEFAULT_DB_PATH = "./mcp_stat_data.sqlite"
 DEFAULT_LOG_PATH = "./mcp_stat.log"
 
+# Recognized MCPSTAT_LOG_ENABLED values; anything else defers to log_enabled
+_ENV_BOOL = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+# Write batching - pending records are flushed after this delay or once
+# this many have accumulated, whichever comes first
+DEFAULT_FLUSH_INTERVAL_MS = 200
+DEFAULT_FLUSH_THRESHOLD = 64
+
+# Calls to unregistered tools are only counted; the count is written to the
+# file log at most once per interval
+UNKNOWN_TOOL_REPORT_INTERVAL = 60.0
+
+# Tracking failures are printed to stderr at most once per interval; the
+# next message reports how many were suppressed in between
+ERROR_REPORT_INTERVAL = 5.0
+
+
+def _write_pending_at_exit(db: MCPStatDatabase, pending: deque[UsageRecord]) -> None:
+    """Write records an MCPStat still had queued when it was finalized.
+
+    Must not reference the MCPStat instance, so it is a module function
+    taking the database and queue directly.
+    """
+    if not pending:
+        return
+
+    batch = list(pending)
+    pending.clear()
+    try:
+        db.record_many_sync(batch)
+    except Exception as exc:
+        # Never fail interpreter shutdown due to tracking
+        print(f"[mcpstat] SQLite tracking failed at exit: {exc}", file=sys.stderr)
+
 
 class MCPStat:
     """Main statistics tracking class for MCP servers.
@@ -81,18 +120,43 @@ class MCPStat:
 
     Thread Safety:
         All async methods are thread-safe via asyncio.Lock in database layer.
+
+    Unknown Tools:
+        Every call is recorded by default. With skip_unknown_tools=True (or
+        after an explicit set_known_tools call), @stat.track does not record
+        calls to tool names outside the synced tool list - they are only
+        counted in unknown_tool_calls.
+
+    Write Batching:
+        record() only queues the invocation; queued records are written in a
+        single transaction after flush_interval_ms, once flush_threshold are
+        pending, or before any query. Records still queued when the event
+        loop shuts down or the interpreter exits are written synchronously;
+        call flush() (or close()) to write them earlier.
     """
 
     __slots__ = (
+        "__weakref__",
         "_db",
+        "_errors_reported_at",
+        "_errors_suppressed",
+        "_flush_task",
+        "_known_tool_names",
         "_logger",
+        "_pending",
         "_tools_cache",
+        "_unknown_reported_at",
+        "_unknown_since_report",
+        "_unknown_tool_calls",
         "cleanup_orphans",
         "db_path",
+        "flush_interval_ms",
+        "flush_threshold",
         "log_enabled",
         "log_path",
         "metadata_presets",
         "server_name",
+        "skip_unknown_tools",
     )
 
     def __init__(
@@ -104,6 +168,10 @@ class MCPStat:
         log_enabled: bool | None = None,
         metadata_presets: dict[str, dict[str, Any]] | None = None,
         cleanup_orphans: bool = True,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        flush_threshold: int = DEFAULT_FLUSH_THRESHOLD,
+        sqlite_pragmas: dict[str, str | int] | None = None,
+        skip_unknown_tools: bool = False,
     ) -> None:
         """Initialize MCP statistics tracking.
 
@@ -114,6 +182,14 @@ class MCPStat:
             log_enabled: Enable file logging (default: False, or env var)
             metadata_presets: Pre-defined tool metadata {name: {tags, short}}
             cleanup_orphans: Auto-remove metadata for unregistered tools
+            flush_interval_ms: Delay before queued records are written
+                (0 writes every record immediately)
+            flush_threshold: Pending record count that triggers an immediate flush
+            sqlite_pragmas: SQLite PRAGMA overrides, e.g. {"synchronous": "FULL"}
+                (defaults: synchronous=NORMAL, temp_store=MEMORY, mmap_size=256 MiB,
+                cache_size=64 MiB)
+            skip_unknown_tools: Only count (not record) @stat.track calls to
+                tools missing from the last sync_tools/sync_all list
 
         Environment Variable Overrides:
             MCPSTAT_DB_PATH: Override db_path
@@ -122,26 +198,39 @@ class MCPStat:
         """
         self.server_name = server_name
         self.cleanup_orphans = cleanup_orphans
+        self.skip_unknown_tools = skip_unknown_tools
         self.metadata_presets = metadata_presets or {}
         self._tools_cache: list[Any] | None = None
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_threshold = flush_threshold
+        self._pending: deque[UsageRecord] = deque()
+        self._flush_task: asyncio.Task[None] | None = None
+        self._known_tool_names: frozenset[str] = frozenset()
+        self._unknown_tool_calls = 0
+        self._unknown_since_report = 0
+        self._unknown_reported_at = float("-inf")
+        self._errors_suppressed = 0
+        self._errors_reported_at = float("-inf")
 
         # Resolve paths with env var overrides
         self.db_path = os.getenv("MCPSTAT_DB_PATH", db_path or DEFAULT_DB_PATH)
         self.log_path = os.getenv("MCPSTAT_LOG_PATH", log_path or DEFAULT_LOG_PATH)
 
         # Resolve log_enabled with env var override
-        env_log = os.getenv("MCPSTAT_LOG_ENABLED", "").lower()
-        if env_log in ("true", "1", "yes"):
-            self.log_enabled = True
-        elif env_log in ("false", "0", "no"):
-            self.log_enabled = False
+        env_log = _ENV_BOOL.get(os.getenv("MCPSTAT_LOG_ENABLED", "").lower())
+        if env_log is not None:
+            self.log_enabled = env_log
         else:
-            self.log_enabled = log_enabled if log_enabled is not None else False
+            self.log_enabled = bool(log_enabled)
 
         # Initialize components
-        self._db = MCPStatDatabase(self.db_path)
+        self._db = MCPStatDatabase(self.db_path, pragmas=sqlite_pragmas)
         self._logger = MCPStatLogger(self.log_path if self.log_enabled else None)
 
+        # Write records still queued at interpreter exit (or when this
+        # instance is garbage collected without close())
+        weakref.finalize(self, _write_pending_at_exit, self._db, self._pending)
+
     async def record(
         self,
         name: str,
@@ -189,21 +278,109 @@ class MCPStat:
             ```
         """
         # File logging (if enabled)
-        self._logger.log(name, primitive_type, success=success, error_msg=error_msg)
+        if self._logger.enabled:
+            self._logger.log(name, primitive_type, success=success, error_msg=error_msg)
 
-        # SQLite tracking
-        try:
-            await self._db.record(
+        # SQLite tracking - queued, written in batches
+        if self._enqueue(
+            (
                 name,
                 primitive_type,
-                response_chars=response_chars,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                duration_ms=duration_ms,
+                time.time(),
+                response_chars,
+                input_tokens,
+                output_tokens,
+                duration_ms,
             )
+        ):
+            await self.flush()
+
+    def _enqueue(self, record: UsageRecord) -> bool:
+        """Queue a record and schedule the delayed flush.
+
+        Returns:
+            True if the caller should flush now (threshold reached or
+            batching disabled)
+        """
+        self._pending.append(record)
+        if self.flush_interval_ms <= 0 or len(self._pending) >= self.flush_threshold:
+            return True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        return False
+
+    async def _flush_later(self) -> None:
+        """Flush pending records after flush_interval_ms.
+
+        If the event loop cancels the task first (asyncio.run() does on
+        exit), the pending records are written synchronously instead.
+        """
+        try:
+            await asyncio.sleep(self.flush_interval_ms / 1000)
+            await self.flush()
+        except asyncio.CancelledError:
+            # flush() and close() detach the task before cancelling it and
+            # write the records themselves
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
+                self._flush_sync()
+            raise
+
+    async def flush(self) -> None:
+        """Write all pending records to the database in one transaction.
+
+        Called automatically before queries; call it on shutdown so that
+        records queued within the last flush interval are not lost.
+        """
+        task = self._flush_task
+        self._flush_task = None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+        if not self._pending:
+            return
+
+        batch = list(self._pending)
+        self._pending.clear()
+        try:
+            await self._db.record_many(batch)
         except Exception as exc:
             # Never fail the main flow due to tracking
-            print(f"[mcpstat] SQLite tracking failed for {name}: {exc}", file=sys.stderr)
+            self._report_flush_failure(batch, exc)
+
+    def _flush_sync(self) -> None:
+        """Write all pending records on the calling thread (shutdown paths)."""
+        if not self._pending:
+            return
+
+        batch = list(self._pending)
+        self._pending.clear()
+        try:
+            self._db.record_many_sync(batch)
+        except Exception as exc:
+            self._report_flush_failure(batch, exc)
+
+    def _report_flush_failure(self, batch: list[UsageRecord], exc: Exception) -> None:
+        """Report a dropped batch on stderr."""
+        names = ", ".join(dict.fromkeys(record[0] for record in batch))
+        self._report_error(f"SQLite tracking failed for {names}: {exc}")
+
+    def _report_error(self, message: str) -> None:
+        """Print a tracking failure to stderr, at most once per ERROR_REPORT_INTERVAL.
+
+        A failing database (disk full, locked file) fails every write; this
+        keeps a busy server from flooding stderr with identical messages.
+        """
+        now = time.monotonic()
+        if now - self._errors_reported_at < ERROR_REPORT_INTERVAL:
+            self._errors_suppressed += 1
+            return
+
+        if self._errors_suppressed:
+            message += f" ({self._errors_suppressed} similar errors suppressed)"
+        print(f"[mcpstat] {message}", file=sys.stderr)
+        self._errors_suppressed = 0
+        self._errors_reported_at = now
 
     async def report_tokens(
         self,
@@ -233,10 +410,11 @@ class MCPStat:
             )
             ```
         """
+        await self.flush()
         try:
             await self._db.report_tokens(name, input_tokens, output_tokens)
         except Exception as exc:
-            print(f"[mcpstat] Token reporting failed for {name}: {exc}", file=sys.stderr)
+            self._report_error(f"Token reporting failed for {name}: {exc}")
 
     async def get_stats(
         self,
@@ -244,6 +422,7 @@ class MCPStat:
         include_zero: bool = True,
         limit: int | None = None,
         type_filter: str | None = None,
+        include_metadata: bool = True,
     ) -> dict[str, Any]:
         """Get usage statistics.
 
@@ -251,23 +430,40 @@ class MCPStat:
             include_zero: Include items with zero calls
             limit: Maximum results
             type_filter: Filter by type (tool/prompt/resource)
+            include_metadata: Include tags and descriptions
 
         Returns:
             Usage statistics dictionary with stats list
         """
+        await self.flush()
         return await self._db.get_stats(
             include_zero=include_zero,
             limit=limit,
             type_filter=type_filter,
+            include_metadata=include_metadata,
         )
 
-    async def get_by_type(self) -> dict[str, Any]:
+    async def get_by_type(self, *, top_n: int | None = None) -> dict[str, Any]:
         """Get usage statistics grouped by MCP primitive type.
 
+        Args:
+            top_n: Only return the N most-called entries of each type
+                (summary and totals still cover every entry)
+
         Returns:
             Dictionary with by_type grouping and summary
         """
-        return await self._db.get_by_type()
+        await self.flush()
+        return await self._db.get_by_type(top_n=top_n)
+
+    async def get_type_summary(self) -> dict[str, dict[str, int]]:
+        """Get per-type entry counts and call totals without fetching entries.
+
+        Returns:
+            Mapping of primitive type to count and total_calls
+        """
+        await self.flush()
+        return await self._db.get_type_summary()
 
     async def get_catalog(
         self,
@@ -288,6 +484,7 @@ class MCPStat:
         Returns:
             Catalog dictionary with results
         """
+        await self.flush()
         return await self._db.get_catalog(
             tags=tags,
             query=query,
@@ -295,23 +492,16 @@ class MCPStat:
             limit=limit,
         )
 
-    async def sync_tools(self, tools: list[Any]) -> None:
-        """Synchronize tool metadata from MCP Tool objects.
-
-        Extracts metadata from Tool objects, applies presets,
-        and syncs with database.
-
-        Args:
-            tools: List of MCP Tool objects (with .name, .description)
-        """
-        tool_dicts = []
+    def _tool_entries(self, tools: Iterable[Any]) -> Iterator[dict[str, Any]]:
+        """Yield metadata entries for MCP Tool objects, applying presets."""
+        get_preset = self.metadata_presets.get
 
         for tool in tools:
             name = tool.name
             description = getattr(tool, "description", None)
 
-            # Check for preset metadata
-            preset = self.metadata_presets.get(name, {})
+            # Check for preset metadata (None or an empty preset falls through)
+            preset = get_preset(name)
 
             if preset:
                 tags = normalize_tags(preset.get("tags", []))
@@ -329,31 +519,21 @@ class MCPStat:
             if not tags:
                 tags = [name.lower()]
 
-            tool_dicts.append(
-                {
-                    "name": name,
-                    "description": description or "",
-                    "tags": tags,
-                    "short_description": short,
-                }
-            )
-
-        await self._db.sync_metadata(tool_dicts, cleanup_orphans=self.cleanup_orphans)
-        self._tools_cache = tools
-
-    async def sync_prompts(self, prompts: list[Any]) -> None:
-        """Synchronize prompt metadata from MCP Prompt objects.
+            yield {
+                "name": name,
+                "description": description or "",
+                "tags": tags,
+                "short_description": short,
+            }
 
-        Similar to sync_tools but for prompts. Extracts metadata
-        and registers for tracking.
+    def _prompt_entries(self, prompts: Iterable[Any]) -> Iterator[dict[str, Any]]:
+        """Yield metadata entries for MCP Prompt objects, applying presets."""
+        get_preset = self.metadata_presets.get
 
-        Args:
-            prompts: List of MCP Prompt objects (with .name, .description)
-        """
         for prompt in prompts:
             name = prompt.name
             description = getattr(prompt, "description", None)
-            preset = self.metadata_presets.get(name, {})
+            preset = get_preset(name)
 
             if preset:
                 tags = normalize_tags(preset.get("tags", []))
@@ -366,25 +546,21 @@ class MCPStat:
                 tags = normalize_tags([name, "prompt"], filter_stopwords=True)
                 short = derive_short_description(description, name)
 
-            await self._db.update_metadata(
-                name,
-                tags=tags,
-                short_description=short,
-                full_description=description,
-            )
-
-    async def sync_resources(self, resources: list[Any]) -> None:
-        """Synchronize resource metadata from MCP Resource objects.
+            yield {
+                "name": name,
+                "description": description or "",
+                "tags": tags,
+                "short_description": short,
+            }
 
-        Similar to sync_tools but for resources.
+    def _resource_entries(self, resources: Iterable[Any]) -> Iterator[dict[str, Any]]:
+        """Yield metadata entries for MCP Resource objects, applying presets."""
+        get_preset = self.metadata_presets.get
 
-        Args:
-            resources: List of MCP Resource objects (with .name, .description)
-        """
         for resource in resources:
             name = getattr(resource, "name", None) or str(getattr(resource, "uri", "unknown"))
             description = getattr(resource, "description", None)
-            preset = self.metadata_presets.get(name, {})
+            preset = get_preset(name)
 
             if preset:
                 tags = normalize_tags(preset.get("tags", []))
@@ -393,12 +569,84 @@ class MCPStat:
                 tags = normalize_tags([name, "resource"], filter_stopwords=True)
                 short = derive_short_description(description, name)
 
-            await self._db.update_metadata(
-                name,
-                tags=tags,
-                short_description=short,
-                full_description=description,
-            )
+            yield {
+                "name": name,
+                "description": description or "",
+                "tags": tags,
+                "short_description": short,
+            }
+
+    async def sync_tools(self, tools: list[Any]) -> None:
+        """Synchronize tool metadata from MCP Tool objects.
+
+        Extracts metadata from Tool objects, applies presets,
+        and syncs with database.
+
+        Args:
+            tools: List of MCP Tool objects (with .name, .description)
+        """
+        await self.flush()
+        await self._db.sync_metadata(
+            self._tool_entries(tools), cleanup_orphans=self.cleanup_orphans
+        )
+        self._tools_cache = tools
+        if self.skip_unknown_tools:
+            self.set_known_tools(tool.name for tool in tools)
+
+    async def sync_prompts(self, prompts: list[Any]) -> None:
+        """Synchronize prompt metadata from MCP Prompt objects.
+
+        Similar to sync_tools but for prompts. Extracts metadata
+        and registers for tracking.
+
+        Args:
+            prompts: List of MCP Prompt objects (with .name, .description)
+        """
+        await self._db.sync_metadata(self._prompt_entries(prompts), cleanup_orphans=False)
+
+    async def sync_resources(self, resources: list[Any]) -> None:
+        """Synchronize resource metadata from MCP Resource objects.
+
+        Similar to sync_tools but for resources.
+
+        Args:
+            resources: List of MCP Resource objects (with .name, .description)
+        """
+        await self._db.sync_metadata(self._resource_entries(resources), cleanup_orphans=False)
+
+    async def sync_all(
+        self,
+        *,
+        tools: list[Any] | None = None,
+        resources: list[Any] | None = None,
+        prompts: list[Any] | None = None,
+    ) -> None:
+        """Synchronize tool, resource, and prompt metadata in one transaction.
+
+        Equivalent to calling sync_tools, sync_resources, and sync_prompts,
+        but commits once. When tools are given and cleanup_orphans is enabled,
+        metadata for any name not in the combined lists is removed, so pass
+        every primitive your server exposes.
+
+        Args:
+            tools: List of MCP Tool objects
+            resources: List of MCP Resource objects
+            prompts: List of MCP Prompt objects
+        """
+        entries = itertools.chain(
+            self._tool_entries(tools or ()),
+            self._resource_entries(resources or ()),
+            self._prompt_entries(prompts or ()),
+        )
+
+        await self.flush()
+        await self._db.sync_metadata(
+            entries, cleanup_orphans=self.cleanup_orphans and tools is not None
+        )
+        if tools is not None:
+            self._tools_cache = tools
+            if self.skip_unknown_tools:
+                self.set_known_tools(tool.name for tool in tools)
 
     async def register_metadata(
         self,
@@ -441,6 +689,40 @@ class MCPStat:
         """
         self.metadata_presets[name] = {"tags": tags, "short": short}
 
+    def set_known_tools(self, names: Iterable[str]) -> None:
+        """Set the tool names that @stat.track records.
+
+        Called automatically by sync_tools() and sync_all() when
+        skip_unknown_tools is enabled. Calls to other names are counted in
+        unknown_tool_calls instead of being written to the database. An
+        empty set (the default) tracks every name.
+
+        Args:
+            names: Registered tool names
+        """
+        self._known_tool_names = frozenset(names)
+
+    @property
+    def unknown_tool_calls(self) -> int:
+        """Number of @stat.track calls skipped because the tool was unknown."""
+        return self._unknown_tool_calls
+
+    def _count_unknown_tool(self) -> None:
+        """Count an unknown tool call, logging a summary at most once per interval."""
+        self._unknown_tool_calls += 1
+        self._unknown_since_report += 1
+
+        now = time.monotonic()
+        if now - self._unknown_reported_at >= UNKNOWN_TOOL_REPORT_INTERVAL:
+            self._logger.log(
+                "(unknown)",
+                "tool",
+                success=False,
+                error_msg=f"{self._unknown_since_report} calls to unregistered tools",
+            )
+            self._unknown_since_report = 0
+            self._unknown_reported_at = now
+
     def track(
         self,
         func: Callable[P, Awaitable[T]] | None = None,
@@ -456,6 +738,9 @@ class MCPStat:
         - Execution time (latency)
         - Response size (optional, from return value)
 
+        If known tool names are set (see set_known_tools), calls to other
+        tool names are only counted, not recorded.
+
         Can be used with or without parentheses:
 
         Example:
@@ -489,7 +774,13 @@ class MCPStat:
                 if not isinstance(name, str):
                     name = fn.__name__
 
-                start = time.perf_counter()
+                # Unknown tools (typos, bogus clients) cost no database write
+                known = self._known_tool_names
+                if primitive_type == "tool" and known and name not in known:
+                    self._count_unknown_tool()
+                    return await fn(*args, **kwargs)
+
+                start = perf_counter_ns()
                 error_msg: str | None = None
                 success = True
 
@@ -498,18 +789,13 @@ class MCPStat:
                     return result
                 except Exception as exc:
                     success = False
-                    error_msg = str(exc)
+                    # The message is only written to the file log
+                    error_msg = str(exc) if self._logger.enabled else None
                     raise
                 finally:
-                    duration_ms = int((time.perf_counter() - start) * 1000)
-                    with contextlib.suppress(Exception):  # nosec B110
-                        await self.record(
-                            name,
-                            primitive_type,
-                            success=success,
-                            error_msg=error_msg,
-                            duration_ms=duration_ms,
-                        )
+                    if self._record_timed(name, primitive_type, start, success, error_msg):
+                        with contextlib.suppress(Exception):  # nosec B110
+                            await self.flush()
 
             return wrapper
 
@@ -544,7 +830,7 @@ class MCPStat:
         Yields:
             None - tracking happens on context exit
         """
-        start = time.perf_counter()
+        start = perf_counter_ns()
         error_msg: str | None = None
         success = True
 
@@ -552,22 +838,55 @@ class MCPStat:
             yield
         except Exception as exc:
             success = False
-            error_msg = str(exc)
+            # The message is only written to the file log
+            error_msg = str(exc) if self._logger.enabled else None
             raise
         finally:
-            duration_ms = int((time.perf_counter() - start) * 1000)
-            with contextlib.suppress(Exception):  # nosec B110
-                await self.record(
-                    name,
-                    primitive_type,
-                    success=success,
-                    error_msg=error_msg,
-                    duration_ms=duration_ms,
-                )
+            if self._record_timed(name, primitive_type, start, success, error_msg):
+                with contextlib.suppress(Exception):  # nosec B110
+                    await self.flush()
+
+    def _record_timed(
+        self,
+        name: str,
+        primitive_type: Literal["tool", "prompt", "resource"],
+        start: int,
+        success: bool,
+        error_msg: str | None,
+    ) -> bool:
+        """Log and queue a call timed by track() or tracking().
+
+        Same as record(), but synchronous so the common path creates no
+        coroutine; never raises.
+
+        Args:
+            start: perf_counter_ns() value taken before the call
+
+        Returns:
+            True if the caller should await flush()
+        """
+        duration_ms = (perf_counter_ns() - start) // 1_000_000
+        try:
+            if self._logger.enabled:
+                self._logger.log(name, primitive_type, success=success, error_msg=error_msg)
+            return self._enqueue((name, primitive_type, time.time(), None, None, None, duration_ms))
+        except Exception:  # nosec B110
+            # Never fail the main flow due to tracking
+            return False
 
     def close(self) -> None:
         """Release resources.
 
         Call during server shutdown for clean resource release.
+        Pending records are written synchronously.
         """
+        task = self._flush_task
+        self._flush_task = None
+        if task is not None:
+            # The loop may already be closed; the records are written below
+            with contextlib.suppress(RuntimeError):
+                task.cancel()
+
+        self._flush_sync()
+        self._db.close()
         self._logger.close()
@@ -8,35 +8,283 @@ SPDX-License-Identifier: MIT
 SQLite database management for mcpstat.
 
 Provides schema creation, migrations, and async-safe queries.
-Uses a single connection with asyncio.Lock for thread safety.
+Uses a single connection, driven from one worker thread so that
+blocking SQLite calls never run on the event loop.
 """
 
 from __future__ import annotations
 
 import asyncio
+import math
 import sqlite3
-from contextlib import contextmanager
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
-from mcpstat.utils import parse_tags_string, tags_to_string
+from mcpstat.utils import _parse_tags_string, parse_tags_string, tags_to_string
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Generator, Iterable, Mapping
     from typing import Literal
 
+T = TypeVar("T")
+
 # Schema version for migrations
 # v1: Initial schema
 # v2: Added token tracking columns (total_input_tokens, total_output_tokens,
 #     total_response_chars, estimated_tokens)
 # v3: Added latency tracking columns (total_duration_ms, min_duration_ms,
 #     max_duration_ms)
-SCHEMA_VERSION = 3
+# v4: Added mcpstat_metadata_tags (one row per tag) for tag filtering in SQL
+SCHEMA_VERSION = 4
+
+# Columns added to mcpstat_usage after v1, as (name, definition)
+_USAGE_MIGRATION_COLUMNS = (
+    # v2: token tracking
+    ("total_input_tokens", "INTEGER NOT NULL DEFAULT 0"),
+    ("total_output_tokens", "INTEGER NOT NULL DEFAULT 0"),
+    ("total_response_chars", "INTEGER NOT NULL DEFAULT 0"),
+    ("estimated_tokens", "INTEGER NOT NULL DEFAULT 0"),
+    # v3: latency tracking
+    ("total_duration_ms", "INTEGER NOT NULL DEFAULT 0"),
+    ("min_duration_ms", "INTEGER"),  # NULL means no data yet
+    ("max_duration_ms", "INTEGER"),  # NULL means no data yet
+)
 
 # Token estimation: ~3.5 characters per token (conservative for mixed content)
 CHARS_PER_TOKEN = 3.5
 
+# Per-connection PRAGMAs. The write-ahead log (set once in _ensure_schema) only
+# needs fsync at checkpoints, so synchronous=NORMAL is still crash-safe.
+# The busy timeout comes from sqlite3.connect(timeout=30.0).
+DEFAULT_PRAGMAS: dict[str, str | int] = {
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,  # 256 MiB
+    "cache_size": -65536,  # 64 MiB (negative values are KiB)
+}
+
+# Rows sampled per index by ANALYZE / PRAGMA optimize, bounding their cost
+_ANALYSIS_LIMIT_SQL = "PRAGMA analysis_limit=400"
+
+# A pending invocation: (name, type, unix timestamp, response_chars,
+# input_tokens, output_tokens, duration_ms)
+UsageRecord = tuple[str, str, float, int | None, int | None, int | None, int | None]
+
+# Query results are reused for this many seconds, or until this manager writes
+DEFAULT_READ_CACHE_TTL = 5.0
+READ_CACHE_SIZE = 32
+
+_RECORD_SQL = """
+    INSERT INTO mcpstat_usage (
+        name, type, call_count, last_accessed, created_at,
+        total_input_tokens, total_output_tokens,
+        total_response_chars, estimated_tokens,
+        total_duration_ms, min_duration_ms, max_duration_ms
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET
+        call_count = call_count + excluded.call_count,
+        last_accessed = excluded.last_accessed,
+        type = excluded.type,
+        total_input_tokens = total_input_tokens + excluded.total_input_tokens,
+        total_output_tokens = total_output_tokens + excluded.total_output_tokens,
+        total_response_chars = total_response_chars + excluded.total_response_chars,
+        estimated_tokens = estimated_tokens + excluded.estimated_tokens,
+        total_duration_ms = total_duration_ms + COALESCE(excluded.total_duration_ms, 0),
+        min_duration_ms = CASE
+            WHEN excluded.min_duration_ms IS NULL THEN min_duration_ms
+            WHEN min_duration_ms IS NULL THEN excluded.min_duration_ms
+            ELSE MIN(min_duration_ms, excluded.min_duration_ms)
+        END,
+        max_duration_ms = CASE
+            WHEN excluded.max_duration_ms IS NULL THEN max_duration_ms
+            WHEN max_duration_ms IS NULL THEN excluded.max_duration_ms
+            ELSE MAX(max_duration_ms, excluded.max_duration_ms)
+        END
+"""
+
+
+def _stats_sql(by_type: bool, exclude_zero: bool, limited: bool, with_metadata: bool) -> str:
+    """Build the get_stats query for one combination of filters.
+
+    Without metadata the join is skipped and the three metadata columns
+    are selected as NULL, so every variant has the same column layout.
+    The per-call token and latency averages are computed in the query.
+    """
+    conditions = []
+    if by_type:
+        conditions.append("u.type = ?")
+    if exclude_zero:
+        conditions.append("u.call_count > 0")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    if with_metadata:
+        metadata = "m.tags, m.short_description, m.full_description"
+        join = "LEFT JOIN mcpstat_metadata m ON u.name = m.name"
+    else:
+        metadata, join = "NULL, NULL, NULL", ""
+    # Safe: assembled from fixed fragments only
+    return f"""
+        SELECT u.name, u.type, u.call_count, u.last_accessed,
+               u.total_input_tokens, u.total_output_tokens,
+               u.total_response_chars, u.estimated_tokens,
+               u.total_duration_ms, u.min_duration_ms, u.max_duration_ms,
+               {metadata},
+               CASE
+                   WHEN u.call_count > 0 AND u.total_input_tokens + u.total_output_tokens > 0
+                   THEN CAST((u.total_input_tokens + u.total_output_tokens) / u.call_count AS INTEGER)
+                   WHEN u.call_count > 0 AND u.estimated_tokens > 0
+                   THEN CAST(u.estimated_tokens / u.call_count AS INTEGER)
+                   ELSE 0
+               END,
+               CASE
+                   WHEN u.call_count > 0 AND u.total_duration_ms > 0
+                   THEN CAST(u.total_duration_ms / u.call_count AS INTEGER)
+                   ELSE 0
+               END
+        FROM mcpstat_usage u
+        {join}
+        {where}
+        ORDER BY u.call_count DESC, u.last_accessed DESC
+        {"LIMIT ?" if limited else ""}
+    """  # nosec B608
+
+
+# get_stats SQL keyed by (type filter, exclude zero, limit, metadata) - built
+# once, so each variant is one string the connection's statement cache can reuse
+_STATS_SQL = {
+    (by_type, exclude_zero, limited, with_metadata): _stats_sql(
+        by_type, exclude_zero, limited, with_metadata
+    )
+    for by_type in (False, True)
+    for exclude_zero in (False, True)
+    for limited in (False, True)
+    for with_metadata in (False, True)
+}
+
+
+# Per-type usage totals, shared by get_by_type() and get_type_summary()
+_TYPE_SUMMARY_SQL = """
+    SELECT type, COUNT(*) as count, SUM(call_count) as total
+    FROM mcpstat_usage
+    GROUP BY type
+"""
+
+# Most-called rows per type; ROW_NUMBER() ranks within each type so a
+# single query returns the top N of every bucket
+_TOP_BY_TYPE_SQL = """
+    SELECT name, type, call_count, last_accessed
+    FROM (
+        SELECT name, type, call_count, last_accessed,
+               ROW_NUMBER() OVER (
+                   PARTITION BY type ORDER BY call_count DESC, last_accessed DESC
+               ) AS type_rank
+        FROM mcpstat_usage
+    )
+    WHERE type_rank <= ?
+    ORDER BY call_count DESC
+"""
+
+
+# (unix second, formatted) - timestamps within a batch mostly share a second
+_iso_cache: tuple[int, str] = (-1, "")
+
+
+def _iso(timestamp: float) -> str:
+    """Format a unix timestamp as the ISO-8601 UTC string stored in the database.
+
+    The string for the most recent second is cached, so repeated calls
+    within one second skip datetime formatting.
+    """
+    global _iso_cache
+    second = math.floor(timestamp)
+    cached = _iso_cache
+    if cached[0] != second:
+        formatted = datetime.fromtimestamp(second, timezone.utc).isoformat(timespec="seconds")
+        cached = _iso_cache = (second, formatted)
+    return cached[1]
+
+
+def _usage_rows(records: Iterable[UsageRecord]) -> list[tuple[Any, ...]]:
+    """Coalesce UsageRecords into one _RECORD_SQL parameter row per name.
+
+    Counts, tokens and durations are summed and min/max durations combined,
+    so a burst of calls to one tool costs a single upsert. The result is the
+    same as applying the records one by one.
+    """
+    # name -> [type, count, first_ts, last_ts, input, output, chars,
+    #          estimated, duration_total, duration_min, duration_max]
+    merged: dict[str, list[Any]] = {}
+
+    for (
+        name,
+        primitive_type,
+        timestamp,
+        response_chars,
+        input_tokens,
+        output_tokens,
+        duration_ms,
+    ) in records:
+        # Calculate estimated tokens from response size
+        est_tokens = 0
+        if response_chars is not None and response_chars > 0:
+            est_tokens = max(1, int(response_chars / CHARS_PER_TOKEN))
+
+        # Prepare duration values
+        dur_ms = duration_ms if duration_ms is not None and duration_ms >= 0 else None
+
+        acc = merged.get(name)
+        if acc is None:
+            merged[name] = [
+                primitive_type,
+                1,
+                timestamp,
+                timestamp,
+                input_tokens or 0,
+                output_tokens or 0,
+                response_chars or 0,
+                est_tokens,
+                dur_ms or 0,
+                dur_ms,
+                dur_ms,
+            ]
+            continue
+
+        acc[0] = primitive_type
+        acc[1] += 1
+        acc[3] = timestamp
+        acc[4] += input_tokens or 0
+        acc[5] += output_tokens or 0
+        acc[6] += response_chars or 0
+        acc[7] += est_tokens
+        if dur_ms is not None:
+            acc[8] += dur_ms
+            acc[9] = dur_ms if acc[9] is None else min(acc[9], dur_ms)
+            acc[10] = dur_ms if acc[10] is None else max(acc[10], dur_ms)
+
+    return [
+        (
+            name,
+            acc[0],
+            acc[1],
+            _iso(acc[3]),
+            _iso(acc[2]),
+            *acc[4:],
+        )
+        for name, acc in merged.items()
+    ]
+
+
+def _type_summary(rows: Iterable[sqlite3.Row]) -> dict[str, dict[str, int]]:
+    """Convert _TYPE_SUMMARY_SQL rows into the per-type summary mapping."""
+    return {row["type"]: {"count": row["count"], "total_calls": row["total"] or 0} for row in rows}
+
 
 class MCPStatDatabase:
     """SQLite database manager for MCP usage tracking.
@@ -48,90 +296,274 @@ class MCPStatDatabase:
     - Orphan cleanup for removed tools
 
     Thread Safety:
-        All async methods are protected by an asyncio.Lock.
-        Sync methods (_ensure_schema) are only called during init.
+        Async methods run their SQL on a single-thread executor, which
+        keeps the event loop free and runs operations in call order.
+        The connection itself is guarded by a lock, so the blocking
+        methods (record_many_sync, close) are safe from any thread.
 
     Connection Management:
-        Uses a new connection per operation for simplicity and
-        to avoid connection state issues in async contexts.
-        SQLite's WAL mode could be enabled for better concurrency.
+        One connection is opened with the schema and reused by every
+        operation, so the page cache and WAL index stay warm between calls.
+        WAL mode is enabled with the schema; DEFAULT_PRAGMAS (plus any
+        overrides) are applied when the connection is opened. close()
+        releases it; the next operation reconnects.
     """
 
-    __slots__ = ("_initialized", "_lock", "db_path")
-
-    def __init__(self, db_path: str) -> None:
+    __slots__ = (
+        "__weakref__",
+        "_conn",
+        "_conn_lock",
+        "_executor",
+        "_finalizer",
+        "_initialized",
+        "_pragma_sql",
+        "_read_cache",
+        "_write_epoch",
+        "db_path",
+        "read_cache_ttl",
+    )
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        pragmas: Mapping[str, str | int] | None = None,
+        read_cache_ttl: float = DEFAULT_READ_CACHE_TTL,
+    ) -> None:
         """Initialize database manager.
 
         Args:
             db_path: Path to SQLite database file
+            pragmas: PRAGMA overrides applied to every connection,
+                merged over DEFAULT_PRAGMAS
+            read_cache_ttl: Seconds a query result is reused while the
+                database is unchanged (0 disables)
+
+        Raises:
+            ValueError: If a PRAGMA name or value is not a plain identifier/number
 
         Note:
             Schema is created lazily on first operation.
         """
         self.db_path = db_path
-        self._lock: asyncio.Lock | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._conn_lock = threading.RLock()
         self._initialized = False
+        self._conn: sqlite3.Connection | None = None
+        self._finalizer: weakref.finalize[Any, Any] | None = None
+        self.read_cache_ttl = read_cache_ttl
+        self._read_cache: OrderedDict[tuple[Any, ...], tuple[float, int, Any]] = OrderedDict()
+        self._write_epoch = 0
+
+        merged = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        for key, value in merged.items():
+            # Values are interpolated into SQL, so only allow simple tokens
+            if not key.isidentifier() or not str(value).lstrip("-").isalnum():
+                raise ValueError(f"Invalid SQLite PRAGMA: {key}={value!r}")
+        self._pragma_sql = tuple(f"PRAGMA {key}={value}" for key, value in merged.items())
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run blocking database work on the database thread.
+
+        The executor has a single worker, so operations run one at a time
+        in the order they were awaited.
+        """
+        executor = self._executor
+        if executor is None:
+            executor = self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="mcpstat-db"
+            )
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+    async def _read(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a read query via _run(), reusing a recent identical result.
+
+        Results are keyed by the query function, its (hashable) arguments
+        and the write epoch, so any write made through this manager
+        invalidates them. Commits from other connections (including other
+        processes) change PRAGMA data_version, which is checked before a
+        cached result is returned. Cached results must be immutable (rows
+        and tuples).
+        """
+        if self.read_cache_ttl <= 0:
+            return await self._run(fn, *args)
+
+        cache = self._read_cache
+        key = (fn.__name__, args, self._write_epoch)
+        now = time.monotonic()
+        hit = cache.get(key)
+        seen_version = None
+        cached: object = None
+        if hit is not None and now - hit[0] < self.read_cache_ttl:
+            _, seen_version, cached = hit
+
+        fresh: tuple[int, T] | None = await self._run(
+            self._read_if_changed, seen_version, fn, *args
+        )
+        if fresh is None:
+            cache.move_to_end(key)
+            return cast("T", cached)
+
+        data_version, result = fresh
+        cache[key] = (now, data_version, result)
+        if len(cache) > READ_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+
+    def _read_if_changed(
+        self, seen_version: int | None, fn: Callable[..., T], *args: Any
+    ) -> tuple[int, T] | None:
+        """Run fn unless PRAGMA data_version still equals seen_version.
 
-    def _get_lock(self) -> asyncio.Lock:
-        """Get or create the asyncio lock (lazy initialization)."""
-        if self._lock is None:
-            self._lock = asyncio.Lock()
-        return self._lock
+        Returns:
+            (data_version, fn result), or None if the database is unchanged
+        """
+        with self._connect() as conn:
+            data_version: int = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == seen_version:
+            return None
+        return data_version, fn(*args)
+
+    async def _write(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a write via _run(), invalidating cached query results."""
+        # Bumped before queuing: reads queued later run after this write
+        self._write_epoch += 1
+        self._read_cache.clear()
+        return await self._run(fn, *args)
 
     @contextmanager
     def _connect(self) -> Generator[sqlite3.Connection, None, None]:
-        """Context manager for database connections.
+        """Context manager for the shared database connection.
+
+        Opens the connection on first use. An exception inside the block
+        rolls back the uncommitted transaction, as closing a per-operation
+        connection used to.
 
         Yields:
             SQLite connection with row_factory set
         """
-        conn = sqlite3.connect(self.db_path, timeout=30.0)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
-
-    def _migrate_to_v2(self, conn: sqlite3.Connection) -> None:
-        """Migrate schema to v2: Add token tracking columns.
-
-        Safe to run multiple times - checks for existing columns.
+        with self._conn_lock:
+            conn = self._conn
+            finalizer = self._finalizer
+            if conn is not None and finalizer is not None and not finalizer.alive:
+                # Closed by the finalizer at interpreter exit, before
+                # MCPStat wrote its last records - reconnect
+                conn = self._conn = None
+            if conn is None:
+                # Used from the database thread and from blocking callers
+                # (close, record_many_sync); _conn_lock serializes them
+                conn = sqlite3.connect(
+                    self.db_path,
+                    timeout=30.0,
+                    check_same_thread=False,
+                    # Writes take the write lock when their transaction starts,
+                    # so contention waits out the busy timeout instead of
+                    # failing with SQLITE_BUSY partway through
+                    isolation_level="IMMEDIATE",
+                    # Every distinct query stays compiled for the connection's lifetime
+                    cached_statements=256,
+                )
+                conn.row_factory = sqlite3.Row
+                try:
+                    for pragma in self._pragma_sql:
+                        conn.execute(pragma)
+                except BaseException:
+                    conn.close()
+                    raise
+                self._conn = conn
+                # Close the connection if the manager is garbage collected
+                self._finalizer = weakref.finalize(self, conn.close)
+
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+
+    def close(self) -> None:
+        """Stop the database thread and close the shared connection.
+
+        Waits for queued operations to finish. Safe to call multiple
+        times; the next operation reconnects.
         """
-        # Get existing columns in mcpstat_usage
-        cursor = conn.execute("PRAGMA table_info(mcpstat_usage)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
-
-        # Columns to add for token tracking
-        new_columns = [
-            ("total_input_tokens", "INTEGER NOT NULL DEFAULT 0"),
-            ("total_output_tokens", "INTEGER NOT NULL DEFAULT 0"),
-            ("total_response_chars", "INTEGER NOT NULL DEFAULT 0"),
-            ("estimated_tokens", "INTEGER NOT NULL DEFAULT 0"),
-        ]
+        executor = self._executor
+        self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self._read_cache.clear()
+        with self._conn_lock:
+            conn = self._conn
+            if conn is not None:
+                # Re-analyze tables whose statistics went stale; best effort
+                with suppress(sqlite3.Error):
+                    conn.execute(_ANALYSIS_LIMIT_SQL)
+                    conn.execute("PRAGMA optimize")
+            self._close_connection()
+
+    def _close_connection(self) -> None:
+        """Close the shared connection, if open."""
+        with self._conn_lock:
+            finalizer = self._finalizer
+            self._conn = None
+            self._finalizer = None
+            if finalizer is not None:
+                finalizer()
+
+    def _apply_pending_migrations(self, conn: sqlite3.Connection) -> None:
+        """Bring an existing database up to SCHEMA_VERSION.
+
+        PRAGMA user_version records the applied version, so an up-to-date
+        database skips the checks below. Every step is idempotent, for
+        files created before the version was recorded.
+        """
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        if version >= SCHEMA_VERSION:
+            return
 
-        for col_name, col_def in new_columns:
+        # v2 and v3: add the token and latency columns in one pass
+        existing_cols = {row[1] for row in conn.execute("PRAGMA table_info(mcpstat_usage)")}
+        for col_name, col_def in _USAGE_MIGRATION_COLUMNS:
             if col_name not in existing_cols:
                 conn.execute(f"ALTER TABLE mcpstat_usage ADD COLUMN {col_name} {col_def}")
 
-    def _migrate_to_v3(self, conn: sqlite3.Connection) -> None:
-        """Migrate schema to v3: Add latency tracking columns.
+        self._migrate_to_v4(conn)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _migrate_to_v4(self, conn: sqlite3.Connection) -> None:
+        """Migrate schema to v4: Add the per-tag lookup table.
 
-        Safe to run multiple times - checks for existing columns.
+        Safe to run multiple times - the table is only backfilled from
+        mcpstat_metadata.tags when it is first created.
         """
-        # Get existing columns in mcpstat_usage
-        cursor = conn.execute("PRAGMA table_info(mcpstat_usage)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
-
-        # Columns to add for latency tracking
-        new_columns = [
-            ("total_duration_ms", "INTEGER NOT NULL DEFAULT 0"),
-            ("min_duration_ms", "INTEGER"),  # NULL means no data yet
-            ("max_duration_ms", "INTEGER"),  # NULL means no data yet
-        ]
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='mcpstat_metadata_tags'"
+        ).fetchone()
+        if exists:
+            return
 
-        for col_name, col_def in new_columns:
-            if col_name not in existing_cols:
-                conn.execute(f"ALTER TABLE mcpstat_usage ADD COLUMN {col_name} {col_def}")
+        # One row per (tag, name); mcpstat_metadata.tags stays the source for display
+        conn.execute("""
+            CREATE TABLE mcpstat_metadata_tags (
+                tag TEXT NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (tag, name)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX idx_mcpstat_metadata_tags_name ON mcpstat_metadata_tags(name)")
+        self._replace_tags(conn, conn.execute("SELECT name, tags FROM mcpstat_metadata").fetchall())
+
+    @staticmethod
+    def _replace_tags(conn: sqlite3.Connection, entries: Iterable[tuple[str, str]]) -> None:
+        """Rewrite the mcpstat_metadata_tags rows of (name, tags string) entries."""
+        entries = list(entries)
+        conn.executemany(
+            "DELETE FROM mcpstat_metadata_tags WHERE name = ?", [(name,) for name, _ in entries]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO mcpstat_metadata_tags (tag, name) VALUES (?, ?)",
+            [(tag, name) for name, tags in entries for tag in parse_tags_string(tags)],
+        )
 
     def _ensure_schema(self) -> None:
         """Create database schema if not exists.
@@ -143,6 +575,18 @@ class MCPStatDatabase:
         if self._initialized:
             return
 
+        # The database thread and blocking callers (record_many_sync) may get
+        # here together; the first creates the schema, the others wait for it
+        with self._conn_lock:
+            if not self._initialized:
+                self._create_schema()
+                self._initialized = True
+
+    def _create_schema(self) -> None:
+        """Create tables and indexes and run migrations (see _ensure_schema)."""
+        # Reconnect, in case db_path changed since the connection was opened
+        self._close_connection()
+
         # Ensure directory exists
         db_path = Path(self.db_path)
         if db_path.parent.name:
@@ -182,23 +626,38 @@ class MCPStatDatabase:
                 )
             """)
 
-            # Indexes for common queries
+            # Indexes matching the get_stats ORDER BY (with and without the
+            # type filter), so results are read in order instead of sorted.
+            # They replace the single-column type and call_count indexes.
+            conn.execute("DROP INDEX IF EXISTS idx_mcpstat_usage_type")
+            conn.execute("DROP INDEX IF EXISTS idx_mcpstat_usage_count")
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_mcpstat_usage_type
-                ON mcpstat_usage(type)
+                CREATE INDEX IF NOT EXISTS idx_mcpstat_usage_count_last
+                ON mcpstat_usage(call_count DESC, last_accessed DESC)
             """)
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_mcpstat_usage_count
-                ON mcpstat_usage(call_count DESC)
+                CREATE INDEX IF NOT EXISTS idx_mcpstat_usage_type_count
+                ON mcpstat_usage(type, call_count DESC, last_accessed DESC)
             """)
 
             # Run migrations for existing databases
-            self._migrate_to_v2(conn)
-            self._migrate_to_v3(conn)
+            self._apply_pending_migrations(conn)
 
             conn.commit()
 
-        self._initialized = True
+            # Give the query planner statistics for the indexes once; close()
+            # refreshes them with PRAGMA optimize as the tables grow
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'"
+            ).fetchone():
+                conn.execute(_ANALYSIS_LIMIT_SQL)
+                conn.execute("ANALYZE")
+
+    def _fetchall(self, query: str, params: tuple[Any, ...] = ()) -> tuple[sqlite3.Row, ...]:
+        """Run a read query and return all rows."""
+        self._ensure_schema()
+        with self._connect() as conn:
+            return tuple(conn.execute(query, params))
 
     async def record(
         self,
@@ -222,64 +681,54 @@ class MCPStatDatabase:
             output_tokens: Actual output token count (from LLM provider)
             duration_ms: Execution duration in milliseconds
         """
-        self._ensure_schema()
-        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        await self.record_many(
+            [
+                (
+                    name,
+                    primitive_type,
+                    time.time(),
+                    response_chars,
+                    input_tokens,
+                    output_tokens,
+                    duration_ms,
+                )
+            ]
+        )
 
-        # Calculate estimated tokens from response size
-        est_tokens = 0
-        if response_chars is not None and response_chars > 0:
-            est_tokens = max(1, int(response_chars / CHARS_PER_TOKEN))
+    async def record_many(self, records: Iterable[UsageRecord]) -> None:
+        """Record a batch of invocations in a single transaction.
 
-        # Prepare duration values
-        dur_ms = duration_ms if duration_ms is not None and duration_ms >= 0 else None
-        dur_total = dur_ms if dur_ms is not None else 0
+        Records for the same name are coalesced into one upsert; the
+        totals are the same as recording each call individually.
 
-        async with self._get_lock():
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO mcpstat_usage (
-                        name, type, call_count, last_accessed, created_at,
-                        total_input_tokens, total_output_tokens,
-                        total_response_chars, estimated_tokens,
-                        total_duration_ms, min_duration_ms, max_duration_ms
-                    )
-                    VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(name) DO UPDATE SET
-                        call_count = call_count + 1,
-                        last_accessed = excluded.last_accessed,
-                        type = excluded.type,
-                        total_input_tokens = total_input_tokens + excluded.total_input_tokens,
-                        total_output_tokens = total_output_tokens + excluded.total_output_tokens,
-                        total_response_chars = total_response_chars + excluded.total_response_chars,
-                        estimated_tokens = estimated_tokens + excluded.estimated_tokens,
-                        total_duration_ms = total_duration_ms + COALESCE(excluded.total_duration_ms, 0),
-                        min_duration_ms = CASE
-                            WHEN excluded.min_duration_ms IS NULL THEN min_duration_ms
-                            WHEN min_duration_ms IS NULL THEN excluded.min_duration_ms
-                            ELSE MIN(min_duration_ms, excluded.min_duration_ms)
-                        END,
-                        max_duration_ms = CASE
-                            WHEN excluded.max_duration_ms IS NULL THEN max_duration_ms
-                            WHEN max_duration_ms IS NULL THEN excluded.max_duration_ms
-                            ELSE MAX(max_duration_ms, excluded.max_duration_ms)
-                        END
-                    """,
-                    (
-                        name,
-                        primitive_type,
-                        now,
-                        now,
-                        input_tokens or 0,
-                        output_tokens or 0,
-                        response_chars or 0,
-                        est_tokens,
-                        dur_total,
-                        dur_ms,
-                        dur_ms,
-                    ),
-                )
-                conn.commit()
+        Args:
+            records: UsageRecord tuples (name, type, timestamp, response_chars,
+                input_tokens, output_tokens, duration_ms)
+        """
+        rows = _usage_rows(records)
+        if rows:
+            await self._write(self._upsert_usage, rows)
+
+    def record_many_sync(self, records: Iterable[UsageRecord]) -> None:
+        """Blocking variant of record_many() for shutdown paths.
+
+        Runs on the calling thread.
+
+        Args:
+            records: UsageRecord tuples, as for record_many()
+        """
+        rows = _usage_rows(records)
+        if rows:
+            self._write_epoch += 1
+            self._read_cache.clear()
+            self._upsert_usage(rows)
+
+    def _upsert_usage(self, rows: list[tuple[Any, ...]]) -> None:
+        """Apply usage upserts in one transaction."""
+        self._ensure_schema()
+        with self._connect() as conn:
+            conn.executemany(_RECORD_SQL, rows)
+            conn.commit()
 
     async def report_tokens(
         self,
@@ -297,20 +746,22 @@ class MCPStatDatabase:
             input_tokens: Input token count from LLM provider
             output_tokens: Output token count from LLM provider
         """
-        self._ensure_schema()
+        await self._write(self._add_tokens, name, input_tokens, output_tokens)
 
-        async with self._get_lock():
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    UPDATE mcpstat_usage
-                    SET total_input_tokens = total_input_tokens + ?,
-                        total_output_tokens = total_output_tokens + ?
-                    WHERE name = ?
-                    """,
-                    (input_tokens, output_tokens, name),
-                )
-                conn.commit()
+    def _add_tokens(self, name: str, input_tokens: int, output_tokens: int) -> None:
+        """Add token counts to an existing usage row."""
+        self._ensure_schema()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE mcpstat_usage
+                SET total_input_tokens = total_input_tokens + ?,
+                    total_output_tokens = total_output_tokens + ?
+                WHERE name = ?
+                """,
+                (input_tokens, output_tokens, name),
+            )
+            conn.commit()
 
     async def get_stats(
         self,
@@ -318,6 +769,7 @@ class MCPStatDatabase:
         include_zero: bool = True,
         limit: int | None = None,
         type_filter: str | None = None,
+        include_metadata: bool = True,
     ) -> dict[str, Any]:
         """Get usage statistics.
 
@@ -325,45 +777,19 @@ class MCPStatDatabase:
             include_zero: Include items with zero calls
             limit: Maximum number of results
             type_filter: Filter by primitive type
+            include_metadata: Join tags and descriptions (None when False)
 
         Returns:
             Dictionary with stats, totals, and metadata
         """
-        self._ensure_schema()
-
-        async with self._get_lock():
-            with self._connect() as conn:
-                # Build query
-                conditions: list[str] = []
-                params: list[Any] = []
-
-                if type_filter:
-                    conditions.append("u.type = ?")
-                    params.append(type_filter)
-
-                if not include_zero:
-                    conditions.append("u.call_count > 0")
+        params: list[Any] = []
+        if type_filter:
+            params.append(type_filter)
+        if limit:
+            params.append(limit)
+        query = _STATS_SQL[bool(type_filter), not include_zero, bool(limit), include_metadata]
 
-                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-
-                # Safe: where clause constructed from enum/bool params, not user input
-                query = f"""
-                    SELECT u.name, u.type, u.call_count, u.last_accessed,
-                           u.total_input_tokens, u.total_output_tokens,
-                           u.total_response_chars, u.estimated_tokens,
-                           u.total_duration_ms, u.min_duration_ms, u.max_duration_ms,
-                           m.tags, m.short_description, m.full_description
-                    FROM mcpstat_usage u
-                    LEFT JOIN mcpstat_metadata m ON u.name = m.name
-                    {where}
-                    ORDER BY u.call_count DESC, u.last_accessed DESC
-                """  # nosec B608
-
-                if limit:
-                    query += " LIMIT ?"
-                    params.append(limit)
-
-                rows = conn.execute(query, params).fetchall()
+        rows = await self._read(self._fetchall, query, tuple(params))
 
         # Build result
         stats: list[dict[str, Any]] = []
@@ -373,51 +799,61 @@ class MCPStatDatabase:
         total_output_tokens = 0
         total_estimated_tokens = 0
         total_duration_ms = 0
-
-        for row in rows:
-            count = row["call_count"] or 0
+        latest: str | None = None
+
+        # Unpack positionally (column order of _stats_sql) instead of by key
+        for (
+            name,
+            ptype,
+            count,
+            last_accessed,
+            input_tokens,
+            output_tokens,
+            response_chars,
+            estimated,
+            duration_ms,
+            min_dur,
+            max_dur,
+            raw_tags,
+            short_description,
+            full_description,
+            avg_tokens,
+            avg_latency_ms,
+        ) in rows:
+            count = count or 0
             total_calls += count
             if count == 0:
                 zero_count += 1
 
-            input_tokens = row["total_input_tokens"] or 0
-            output_tokens = row["total_output_tokens"] or 0
-            estimated = row["estimated_tokens"] or 0
-            duration_ms = row["total_duration_ms"] or 0
-            min_dur = row["min_duration_ms"]
-            max_dur = row["max_duration_ms"]
+            input_tokens = input_tokens or 0
+            output_tokens = output_tokens or 0
+            estimated = estimated or 0
+            duration_ms = duration_ms or 0
+
+            # Rows are ordered by call count, so track the newest access here
+            if last_accessed and (latest is None or last_accessed > latest):
+                latest = last_accessed
 
             total_input_tokens += input_tokens
             total_output_tokens += output_tokens
             total_estimated_tokens += estimated
             total_duration_ms += duration_ms
 
-            # Calculate average tokens per call
-            avg_tokens = 0
-            if count > 0:
-                actual_total = input_tokens + output_tokens
-                if actual_total > 0:
-                    avg_tokens = actual_total // count
-                elif estimated > 0:
-                    avg_tokens = estimated // count
-
-            # Calculate average latency per call
-            avg_latency_ms = 0
-            if count > 0 and duration_ms > 0:
-                avg_latency_ms = duration_ms // count
+            # Parsed tags are memoized per distinct string (a fresh list per entry)
+            tag_list = list(_parse_tags_string(raw_tags)) if include_metadata else None
 
             stats.append(
                 {
-                    "name": row["name"],
-                    "type": row["type"],
+                    "name": name,
+                    "type": ptype,
                     "call_count": count,
-                    "last_accessed": row["last_accessed"],
-                    "tags": parse_tags_string(row["tags"]),
-                    "short_description": row["short_description"],
-                    "full_description": row["full_description"],
+                    "last_accessed": last_accessed,
+                    "tags": tag_list,
+                    "short_description": short_description,
+                    "full_description": full_description,
                     "total_input_tokens": input_tokens,
                     "total_output_tokens": output_tokens,
-                    "total_response_chars": row["total_response_chars"] or 0,
+                    "total_response_chars": response_chars or 0,
                     "estimated_tokens": estimated,
                     "avg_tokens_per_call": avg_tokens,
                     "total_duration_ms": duration_ms,
@@ -427,8 +863,6 @@ class MCPStatDatabase:
                 }
             )
 
-        latest = max((s["last_accessed"] for s in stats if s["last_accessed"]), default=None)
-
         return {
             "tracked_count": len(stats),
             "total_calls": total_calls,
@@ -447,27 +881,17 @@ class MCPStatDatabase:
             "stats": stats,
         }
 
-    async def get_by_type(self) -> dict[str, Any]:
+    async def get_by_type(self, *, top_n: int | None = None) -> dict[str, Any]:
         """Get usage statistics grouped by MCP primitive type.
 
+        Args:
+            top_n: Only return the N most-called entries of each type
+                (summary and totals still cover every entry)
+
         Returns:
             Dictionary with by_type grouping and summary
         """
-        self._ensure_schema()
-
-        async with self._get_lock():
-            with self._connect() as conn:
-                rows = conn.execute("""
-                    SELECT name, type, call_count, last_accessed
-                    FROM mcpstat_usage
-                    ORDER BY call_count DESC
-                """).fetchall()
-
-                summaries = conn.execute("""
-                    SELECT type, COUNT(*) as count, SUM(call_count) as total
-                    FROM mcpstat_usage
-                    GROUP BY type
-                """).fetchall()
+        rows, summaries = await self._read(self._select_by_type, top_n)
 
         # Group by type
         by_type: dict[str, list[dict[str, Any]]] = {
@@ -475,32 +899,54 @@ class MCPStatDatabase:
             "resource": [],
             "prompt": [],
         }
-        total_calls = 0
 
-        for row in rows:
+        for name, ptype, count, last_accessed in rows:
             entry = {
-                "name": row["name"],
-                "type": row["type"],
-                "call_count": row["call_count"] or 0,
-                "last_accessed": row["last_accessed"],
+                "name": name,
+                "type": ptype,
+                "call_count": count or 0,
+                "last_accessed": last_accessed,
             }
-            total_calls += entry["call_count"]
-            ptype = row["type"] or "tool"
-            by_type.setdefault(ptype, []).append(entry)
-
-        # Build summary
-        summary = {
-            row["type"]: {"count": row["count"], "total_calls": row["total"] or 0}
-            for row in summaries
-        }
+            by_type.setdefault(ptype or "tool", []).append(entry)
+
+        summary = _type_summary(summaries)
 
         return {
             "by_type": by_type,
             "summary": summary,
-            "total_calls": total_calls,
-            "total_items": len(rows),
+            "total_calls": sum(s["total_calls"] for s in summary.values()),
+            "total_items": sum(s["count"] for s in summary.values()),
         }
 
+    async def get_type_summary(self) -> dict[str, dict[str, int]]:
+        """Get per-type entry counts and call totals without fetching entries.
+
+        Returns:
+            Mapping of primitive type to {"count": int, "total_calls": int}
+            (the summary part of get_by_type())
+        """
+        return _type_summary(await self._read(self._fetchall, _TYPE_SUMMARY_SQL))
+
+    def _select_by_type(
+        self, top_n: int | None
+    ) -> tuple[tuple[sqlite3.Row, ...], tuple[sqlite3.Row, ...]]:
+        """Fetch usage rows and per-type summaries from one connection."""
+        self._ensure_schema()
+        with self._connect() as conn:
+            # Build the cached tuples straight from the cursors (no fetchall list copy)
+            if top_n:
+                rows = tuple(conn.execute(_TOP_BY_TYPE_SQL, (top_n,)))
+            else:
+                rows = tuple(
+                    conn.execute("""
+                        SELECT name, type, call_count, last_accessed
+                        FROM mcpstat_usage
+                        ORDER BY call_count DESC
+                    """)
+                )
+            summaries = tuple(conn.execute(_TYPE_SUMMARY_SQL))
+        return rows, summaries
+
     async def update_metadata(
         self,
         name: str,
@@ -517,108 +963,142 @@ class MCPStatDatabase:
             short_description: Brief description
             full_description: Full description
         """
+        now = _iso(time.time())
+        row = (
+            name,
+            tags_to_string(tags),
+            short_description,
+            full_description or "",
+            SCHEMA_VERSION,
+            now,
+        )
+        await self._write(self._upsert_metadata, row)
+
+    def _upsert_metadata(self, row: tuple[Any, ...]) -> None:
+        """Insert or replace one metadata row."""
         self._ensure_schema()
-        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
-
-        async with self._get_lock():
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO mcpstat_metadata
-                    (name, tags, short_description, full_description, schema_version, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(name) DO UPDATE SET
-                        tags = excluded.tags,
-                        short_description = excluded.short_description,
-                        full_description = excluded.full_description,
-                        schema_version = excluded.schema_version,
-                        updated_at = excluded.updated_at
-                    """,
-                    (
-                        name,
-                        tags_to_string(tags),
-                        short_description,
-                        full_description or "",
-                        SCHEMA_VERSION,
-                        now,
-                    ),
-                )
-                conn.commit()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO mcpstat_metadata
+                (name, tags, short_description, full_description, schema_version, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    tags = excluded.tags,
+                    short_description = excluded.short_description,
+                    full_description = excluded.full_description,
+                    schema_version = excluded.schema_version,
+                    updated_at = excluded.updated_at
+                """,
+                row,
+            )
+            self._replace_tags(conn, [(row[0], row[1])])
+            conn.commit()
 
     async def sync_metadata(
         self,
-        tools: list[dict[str, Any]],
+        tools: Iterable[Mapping[str, Any]],
         *,
         cleanup_orphans: bool = True,
     ) -> None:
         """Synchronize metadata table with registered tools.
 
         Args:
-            tools: List of tool dicts with name, description, tags, short_description
+            tools: Tool dicts with name, description, tags, short_description
+                (any iterable - it is consumed once)
             cleanup_orphans: Remove metadata for unregistered tools
         """
+        now = _iso(time.time())
+        # Later entries win when a name repeats (as with per-row upserts)
+        latest = {t["name"]: t for t in tools}
+        await self._write(self._apply_metadata, latest, now, cleanup_orphans)
+
+    def _apply_metadata(
+        self,
+        latest: Mapping[str, Mapping[str, Any]],
+        now: str,
+        cleanup_orphans: bool,
+    ) -> None:
+        """Diff entries against the metadata table and write the changes."""
         self._ensure_schema()
-        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
-        tool_names = {t["name"] for t in tools}
-
-        async with self._get_lock():
-            with self._connect() as conn:
-                # Get existing
-                existing = {
-                    row["name"]: row
-                    for row in conn.execute(
-                        "SELECT name, tags, short_description, full_description, schema_version FROM mcpstat_metadata"
+        with self._connect() as conn:
+            # Hold the write lock from the read on, so the diff cannot go stale
+            conn.execute("BEGIN IMMEDIATE")
+            # Get existing
+            existing = {
+                row["name"]: row
+                for row in conn.execute(
+                    "SELECT name, tags, short_description, full_description, schema_version FROM mcpstat_metadata"
+                )
+            }
+
+            inserts: list[tuple[Any, ...]] = []
+            updates: list[tuple[Any, ...]] = []
+
+            for tool in latest.values():
+                name = tool["name"]
+                tags_str = tags_to_string(tool.get("tags", [name]))
+                short = tool.get("short_description", "")
+                full = tool.get("description", "")
+
+                current = existing.get(name)
+                if current is None:
+                    inserts.append((name, tags_str, short, full, SCHEMA_VERSION, now))
+                elif (
+                    current["tags"] != tags_str
+                    or current["short_description"] != short
+                    or current["full_description"] != full
+                    or (current["schema_version"] or 0) != SCHEMA_VERSION
+                ):
+                    updates.append((tags_str, short, full, SCHEMA_VERSION, now, name))
+
+            if inserts:
+                conn.executemany(
+                    """
+                    INSERT INTO mcpstat_metadata
+                    (name, tags, short_description, full_description, schema_version, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    inserts,
+                )
+            if updates:
+                conn.executemany(
+                    """
+                    UPDATE mcpstat_metadata
+                    SET tags=?, short_description=?, full_description=?, schema_version=?, updated_at=?
+                    WHERE name=?
+                    """,
+                    updates,
+                )
+            if inserts or updates:
+                self._replace_tags(
+                    conn, [(r[0], r[1]) for r in inserts] + [(r[5], r[0]) for r in updates]
+                )
+
+            # Cleanup orphans
+            if cleanup_orphans:
+                orphans = existing.keys() - latest.keys()
+                if orphans:
+                    # A temp table instead of one placeholder per name keeps
+                    # large orphan sets under SQLite's host-parameter limit
+                    conn.execute("CREATE TEMP TABLE _mcpstat_orphans(name TEXT PRIMARY KEY)")
+                    conn.executemany(
+                        "INSERT INTO _mcpstat_orphans VALUES (?)", ((o,) for o in orphans)
                     )
-                }
+                    conn.execute(
+                        "DELETE FROM mcpstat_metadata WHERE name IN (SELECT name FROM _mcpstat_orphans)"
+                    )
+                    conn.execute(
+                        "DELETE FROM mcpstat_metadata_tags "
+                        "WHERE name IN (SELECT name FROM _mcpstat_orphans)"
+                    )
+                    conn.execute(
+                        "DELETE FROM mcpstat_usage "
+                        "WHERE name IN (SELECT name FROM _mcpstat_orphans) AND type='tool'"
+                    )
+                    conn.execute("DROP TABLE _mcpstat_orphans")
 
-                for tool in tools:
-                    name = tool["name"]
-                    tags_str = tags_to_string(tool.get("tags", [name]))
-                    short = tool.get("short_description", "")
-                    full = tool.get("description", "")
-
-                    if name not in existing:
-                        conn.execute(
-                            """
-                            INSERT INTO mcpstat_metadata
-                            (name, tags, short_description, full_description, schema_version, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                            """,
-                            (name, tags_str, short, full, SCHEMA_VERSION, now),
-                        )
-                    else:
-                        current = existing[name]
-                        if (
-                            current["tags"] != tags_str
-                            or current["short_description"] != short
-                            or current["full_description"] != full
-                            or (current["schema_version"] or 0) != SCHEMA_VERSION
-                        ):
-                            conn.execute(
-                                """
-                                UPDATE mcpstat_metadata
-                                SET tags=?, short_description=?, full_description=?, schema_version=?, updated_at=?
-                                WHERE name=?
-                                """,
-                                (tags_str, short, full, SCHEMA_VERSION, now, name),
-                            )
-
-                # Cleanup orphans
-                if cleanup_orphans:
-                    orphans = set(existing.keys()) - tool_names
-                    if orphans:
-                        # Safe: placeholders are ? markers, values passed via tuple
-                        placeholders = ",".join("?" * len(orphans))
-                        conn.execute(
-                            f"DELETE FROM mcpstat_metadata WHERE name IN ({placeholders})",  # nosec B608
-                            tuple(orphans),
-                        )
-                        conn.execute(
-                            f"DELETE FROM mcpstat_usage WHERE name IN ({placeholders}) AND type='tool'",  # nosec B608
-                            tuple(orphans),
-                        )
-
-                conn.commit()
+            conn.commit()
 
     async def get_catalog(
         self,
@@ -639,78 +1119,116 @@ class MCPStatDatabase:
         Returns:
             Catalog dictionary with results and metadata
         """
-        self._ensure_schema()
-
-        async with self._get_lock():
-            with self._connect() as conn:
-                rows = conn.execute("""
-                    SELECT m.name, m.tags, m.short_description, m.full_description,
-                           m.updated_at, m.schema_version,
-                           u.call_count, u.last_accessed
-                    FROM mcpstat_metadata m
-                    LEFT JOIN mcpstat_usage u ON m.name = u.name
-                """).fetchall()
-
-        # Filter and build results
-        results: list[dict[str, Any]] = []
-        all_tags: set[str] = set()
-        total_calls = 0
-
         tag_filters = [t.lower().strip() for t in (tags or []) if t]
         query_text = " ".join((query or "").split()).lower()
+        max_results = limit if limit and limit > 0 else None
 
-        for row in rows:
-            tags_list = parse_tags_string(row["tags"])
-            all_tags.update(tags_list)
-
-            count = row["call_count"] or 0
-            total_calls += count
+        matches, total_tracked, all_tags, total_calls = await self._read(
+            self._select_catalog, tuple(tag_filters), query_text, include_usage, max_results
+        )
 
-            entry = {
+        results = [
+            {
                 "name": row["name"],
                 "short_description": row["short_description"],
                 "full_description": row["full_description"],
-                "tags": tags_list,
+                "tags": list(tags_list),
                 "schema_version": row["schema_version"] or 0,
                 "updated_at": row["updated_at"],
-                "call_count": count if include_usage else None,
+                "call_count": (row["call_count"] or 0) if include_usage else None,
                 "last_accessed": row["last_accessed"] if include_usage else None,
             }
-
-            # Tag filter
-            if tag_filters and not all(t in tags_list for t in tag_filters):
-                continue
-
-            # Text search
-            if query_text:
-                haystack = " ".join(
-                    [
-                        entry["name"],
-                        " ".join(entry["tags"]),
-                        entry["short_description"] or "",
-                        entry["full_description"] or "",
-                    ]
-                ).lower()
-                if query_text not in haystack:
-                    continue
-
-            results.append(entry)
-
-        # Sort
-        results.sort(key=lambda x: x["name"])
-        results.sort(key=lambda x: x["last_accessed"] or "", reverse=True)
-        results.sort(key=lambda x: x["call_count"] or 0, reverse=True)
-
-        if limit and limit > 0:
-            results = results[:limit]
+            for row, tags_list in matches
+        ]
 
         return {
-            "total_tracked": len(rows),
+            "total_tracked": total_tracked,
             "matched": len(results),
-            "all_tags": sorted(all_tags),
+            "all_tags": list(all_tags),
             "filters": {"tags": tag_filters, "query": query_text or None},
             "include_usage": include_usage,
             "limit": limit,
             "total_calls": total_calls if include_usage else None,
             "results": results,
         }
+
+    def _select_catalog(
+        self,
+        tag_filters: tuple[str, ...],
+        query_text: str,
+        include_usage: bool,
+        max_results: int | None,
+    ) -> tuple[tuple[tuple[sqlite3.Row, tuple[str, ...]], ...], int, tuple[str, ...], int]:
+        """Fetch catalog entries in result order, filtering as rows stream in.
+
+        SQLite sorts the rows and applies the tag filters through
+        mcpstat_metadata_tags; without a text search it also applies the
+        limit. The text search is matched here as rows stream in,
+        stopping once max_results entries matched.
+
+        Returns:
+            ((row, tags) matches, total_tracked, all_tags, total_calls)
+        """
+        self._ensure_schema()
+
+        tag_match = "m.name IN (SELECT name FROM mcpstat_metadata_tags WHERE tag = ?)"
+        conditions = [tag_match] * len(tag_filters)
+        params: list[Any] = list(tag_filters)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if include_usage:
+            order = "COALESCE(u.call_count, 0) DESC, COALESCE(u.last_accessed, '') DESC, m.name"
+        else:
+            # Usage is hidden, so entries only sort by name
+            order = "m.name"
+
+        # Safe: where/order built from fixed fragments, values passed as params
+        sql = f"""
+            SELECT m.name, m.tags, m.short_description, m.full_description,
+                   m.updated_at, m.schema_version,
+                   u.call_count, u.last_accessed
+            FROM mcpstat_metadata m
+            LEFT JOIN mcpstat_usage u ON m.name = u.name
+            {where}
+            ORDER BY {order}
+        """  # nosec B608
+        if max_results is not None and not query_text:
+            sql += " LIMIT ?"
+            params.append(max_results)
+
+        matches: list[tuple[sqlite3.Row, tuple[str, ...]]] = []
+
+        with self._connect() as conn:
+            total_tracked, total_calls = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(u.call_count), 0)
+                FROM mcpstat_metadata m
+                LEFT JOIN mcpstat_usage u ON m.name = u.name
+            """).fetchone()
+
+            all_tags = tuple(
+                tag
+                for (tag,) in conn.execute(
+                    "SELECT DISTINCT tag FROM mcpstat_metadata_tags ORDER BY tag"
+                )
+            )
+
+            for row in conn.execute(sql, params):
+                tags_list = _parse_tags_string(row["tags"])
+
+                # Text search
+                if query_text:
+                    haystack = " ".join(
+                        [
+                            row["name"],
+                            " ".join(tags_list),
+                            row["short_description"] or "",
+                            row["full_description"] or "",
+                        ]
+                    ).lower()
+                    if query_text not in haystack:
+                        continue
+
+                matches.append((row, tags_list))
+                if len(matches) == max_results:
+                    break
+
+        return tuple(matches), total_tracked, all_tags, total_calls
@@ -8,24 +8,84 @@ SPDX-License-Identifier: MIT
 File-based audit logging for mcpstat.
 
 Provides optional file logging with minimal overhead when disabled.
-Thread-safe via Python's logging module.
+Entries are buffered in memory and written by a background thread,
+so logging never performs file I/O on the caller's (event loop) thread.
+The file and the writer thread are only created by the first log() call.
 """
 
 from __future__ import annotations
 
-import logging
+import contextlib
+import os
+import sys
+import threading
+import time
+import warnings
+import weakref
+from collections import deque
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from typing import Literal
 
+# Background writer defaults
+DEFAULT_FLUSH_INTERVAL = 0.1  # seconds between drains
+DEFAULT_MAX_PENDING = 10_000  # buffered entries before overflow_policy applies
+WRITER_THREAD_NAME = "mcpstat.usage"
+
+
+def _write_pending(fd: int, pending: deque[str]) -> None:
+    """Write all pending entries with one os.write() per batch.
+
+    The caller must hold the logger's write lock.
+    """
+    batch = []
+    popleft = pending.popleft
+    for _ in range(len(pending)):
+        batch.append(popleft())
+
+    data = "".join(batch).encode("utf-8")
+    # Audit logging must never break the server
+    with contextlib.suppress(OSError):
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+
+
+def _close_writer(
+    fd: int, pending: deque[str], write_lock: threading.Lock, stop: threading.Event
+) -> None:
+    """Stop the writer thread, write pending entries and close the file.
+
+    Runs from close(), when the logger is garbage collected, or at
+    interpreter exit; takes no reference to the logger itself.
+    """
+    stop.set()
+    with write_lock:
+        _write_pending(fd, pending)
+        os.close(fd)
+
+
+def _writer_loop(
+    ref: weakref.ref[MCPStatLogger], stop: threading.Event, flush_interval: float
+) -> None:
+    """Background writer loop; holds the logger only while draining."""
+    while not stop.wait(flush_interval):
+        logger = ref()
+        if logger is None:
+            return
+        logger._drain()
+        del logger
+
 
 class MCPStatLogger:
     """Optional file-based audit logger for MCP usage.
 
     Provides a fallback logging mechanism for debugging and auditing.
-    Uses Python's standard logging module for thread safety.
+    log() formats the entry and appends it to an in-memory deque; a daemon
+    thread drains the deque every flush_interval seconds and writes each
+    batch with a single os.write() on an O_APPEND descriptor.
 
     Log Format:
         YYYY-MM-DDTHH:MM:SS|type:name|status[|error_truncated]
@@ -36,60 +96,125 @@ class MCPStatLogger:
         2026-01-01T10:31:00|tool:unknown_tool|FAIL|Unknown tool
 
     Thread Safety:
-        All operations are thread-safe via Python's logging module.
+        deque.append/popleft are atomic, so log() may be called from any
+        thread without locking.
 
     Performance:
         When disabled (log_path=None), operations are no-ops with
-        minimal overhead (~50ns per call).
+        minimal overhead (~50ns per call). enabled is a plain
+        attribute, so hot call sites can check it before building
+        log() arguments.
+
+    Durability:
+        Pending entries are written on close(), when the logger is garbage
+        collected and at interpreter exit; a hard crash can lose up to
+        flush_interval seconds of entries.
+
+    Overflow:
+        With overflow_policy="block", a log() call that finds max_pending
+        entries buffered writes them on the calling thread - from an
+        async handler, that file write blocks the event loop until it
+        finishes. Use "drop" to keep log() non-blocking under bursts.
     """
 
-    __slots__ = ("_enabled", "_logger", "log_path")
+    __slots__ = (
+        "__weakref__",
+        "_fd",
+        "_finalizer",
+        "_pending",
+        "_stamp",
+        "_stamp_second",
+        "_stop",
+        "_thread",
+        "_thread_name",
+        "_write_lock",
+        "enabled",
+        "flush_interval",
+        "log_path",
+        "max_pending",
+        "overflow_policy",
+    )
 
     def __init__(
         self,
         log_path: str | None = None,
         *,
-        logger_name: str = "mcpstat.usage",
+        logger_name: str | None = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        overflow_policy: Literal["drop", "block"] = "block",
     ) -> None:
         """Initialize file logger.
 
         Args:
             log_path: Path to log file, or None to disable logging
-            logger_name: Logger name for Python logging hierarchy
+            logger_name: Deprecated. Entries no longer go through the logging
+                module; the value only names the background writer thread
+            flush_interval: Seconds between background writes
+            max_pending: Maximum buffered entries
+            overflow_policy: When max_pending is reached, "drop" discards the
+                oldest entries; "block" writes the backlog on the calling
+                thread (blocking the event loop when called from async code)
 
         Note:
-            Creates parent directories if they don't exist.
+            No I/O happens here - the file (and any missing parent
+            directories) is created on the first log() call.
         """
-        self.log_path = log_path
-        self._enabled = log_path is not None
-        self._logger: logging.Logger | None = None
-
-        if self._enabled and log_path:
-            self._setup_logger(log_path, logger_name)
-
-    def _setup_logger(self, log_path: str, logger_name: str) -> None:
-        """Configure the file handler."""
-        # Ensure directory exists
-        log_path_obj = Path(log_path)
-        if log_path_obj.parent.name:
-            log_path_obj.parent.mkdir(parents=True, exist_ok=True)
-
-        self._logger = logging.getLogger(logger_name)
-        self._logger.setLevel(logging.INFO)
-        self._logger.propagate = False  # Don't bubble to root logger
-
-        # Avoid duplicate handlers on re-initialization
-        if not self._logger.handlers:
-            handler = logging.FileHandler(log_path, encoding="utf-8")
-            handler.setFormatter(
-                logging.Formatter("%(asctime)s|%(message)s", datefmt="%Y-%m-%dT%H:%M:%S")
+        if logger_name is not None:
+            warnings.warn(
+                "MCPStatLogger(logger_name=...) is deprecated: entries are written "
+                "directly to log_path, not through the logging module",
+                DeprecationWarning,
+                stacklevel=2,
             )
-            self._logger.addHandler(handler)
 
-    @property
-    def enabled(self) -> bool:
-        """Whether logging is enabled."""
-        return self._enabled
+        self.log_path = log_path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.overflow_policy = overflow_policy
+        self.enabled = log_path is not None
+        self._fd: int | None = None
+        self._finalizer: weakref.finalize[Any, Any] | None = None
+        self._pending: deque[str] = deque(maxlen=max_pending if overflow_policy == "drop" else None)
+        self._stamp = ""
+        self._stamp_second = -1
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._thread_name = logger_name or WRITER_THREAD_NAME
+        self._write_lock = threading.Lock()
+
+    def _setup_writer(self) -> None:
+        """Open the log file and start the background writer."""
+        with self._write_lock:
+            if self._fd is not None or not self.enabled or not self.log_path:
+                return
+            try:
+                # Ensure directory exists
+                log_path_obj = Path(self.log_path)
+                if log_path_obj.parent.name:
+                    log_path_obj.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            except OSError as exc:
+                # Audit logging must never break the server
+                self.enabled = False
+                print(
+                    f"[mcpstat] File logging disabled for {self.log_path}: {exc}", file=sys.stderr
+                )
+                return
+
+            self._fd = fd
+            # Neither the finalizer nor the writer thread keeps the logger
+            # alive, so an abandoned logger is still drained and closed
+            self._finalizer = weakref.finalize(
+                self, _close_writer, fd, self._pending, self._write_lock, self._stop
+            )
+            self._thread = threading.Thread(
+                target=_writer_loop,
+                args=(weakref.ref(self), self._stop, self.flush_interval),
+                name=self._thread_name,
+                daemon=True,
+            )
+            self._thread.start()
 
     def log(
         self,
@@ -110,26 +235,54 @@ class MCPStatLogger:
         Note:
             No-op if logging is disabled - safe to call unconditionally.
         """
-        if not self._enabled or self._logger is None:
+        if not self.enabled:
             return
+        if self._fd is None:
+            self._setup_writer()
+            if not self.enabled:
+                return
 
-        status = "OK" if success else "FAIL"
-        entry = f"{primitive_type}:{name}|{status}"
+        # Local-time timestamp, formatted at most once per second
+        second = int(time.time())
+        if second != self._stamp_second:
+            self._stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._stamp_second = second
 
+        status = "OK" if success else "FAIL"
         if error_msg:
             # Truncate long errors to prevent log bloat
-            entry += f"|{error_msg[:100]}"
+            entry = f"{self._stamp}|{primitive_type}:{name}|{status}|{error_msg[:100]}\n"
+        else:
+            entry = f"{self._stamp}|{primitive_type}:{name}|{status}\n"
+
+        self._pending.append(entry)
+        if self.overflow_policy == "block" and len(self._pending) >= self.max_pending:
+            self._drain()
 
-        self._logger.info(entry)
+    def _drain(self) -> None:
+        """Write all pending entries with one os.write() per batch."""
+        with self._write_lock:
+            fd = self._fd
+            finalizer = self._finalizer
+            # A finalizer that already ran (interpreter exit) closed the file
+            if fd is None or finalizer is None or not finalizer.alive or not self._pending:
+                return
+            _write_pending(fd, self._pending)
 
     def close(self) -> None:
-        """Close all handlers and release resources.
+        """Write pending entries, stop the writer and release the file.
 
         Safe to call multiple times. Should be called during shutdown.
         """
-        if self._logger:
-            for handler in self._logger.handlers[:]:
-                handler.close()
-                self._logger.removeHandler(handler)
-            self._logger = None
-        self._enabled = False
+        self.enabled = False
+        thread = self._thread
+        self._thread = None
+        finalizer = self._finalizer
+        self._finalizer = None
+        if finalizer is not None:
+            # Stops the writer, writes pending entries and closes the file
+            finalizer()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        with self._write_lock:
+            self._fd = None
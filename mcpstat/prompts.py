@@ -12,11 +12,48 @@ Provides the stats prompt generator for LLM-friendly usage reports.
 
 from __future__ import annotations
 
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     from mcpstat.core import MCPStat
 
+# Report sections in display order: (type, heading)
+_SECTIONS = (
+    ("tool", "🔧 Tools"),
+    ("resource", "📚 Resources"),
+    ("prompt", "💬 Prompts"),
+)
+
+_EMPTY_SUMMARY: Mapping[str, int] = MappingProxyType({"count": 0, "total_calls": 0})
+
+
+def _format_section(items: list[dict[str, Any]], limit: int = 5) -> tuple[str, str]:
+    """Format the top N used items and all unused items in one pass.
+
+    Args:
+        items: Entries of one type, sorted by call count
+        limit: Maximum number of used items to list
+
+    Returns:
+        Tuple of (numbered top list, bulleted unused list)
+    """
+    used: list[str] = []
+    unused: list[str] = []
+    for item in items:
+        calls = item.get("call_count", 0)
+        if calls > 0:
+            if len(used) < limit:
+                used.append(f"{len(used) + 1}. `{item['name']}` - **{calls} calls**")
+        elif calls == 0:
+            unused.append(f"- `{item['name']}`")
+    return (
+        "\n".join(used) if used else "(None used yet)",
+        "\n".join(unused) if unused else "(All have been used)",
+    )
+
 
 async def generate_stats_prompt(
     stat: MCPStat,
@@ -47,23 +84,6 @@ async def generate_stats_prompt(
     summary = data["summary"]
     total = data["total_calls"]
 
-    def format_top(items: list[dict[str, Any]], limit: int = 5) -> str:
-        """Format top N items as numbered list."""
-        used = [i for i in items if i.get("call_count", 0) > 0][:limit]
-        if not used:
-            return "(None used yet)"
-        return "\n".join(
-            f"{i + 1}. `{item['name']}` - **{item['call_count']} calls**"
-            for i, item in enumerate(used)
-        )
-
-    def format_unused(items: list[dict[str, Any]]) -> str:
-        """Format unused items as bullet list."""
-        unused = [i for i in items if i.get("call_count", 0) == 0]
-        if not unused:
-            return "(All have been used)"
-        return "\n".join(f"- `{i['name']}`" for i in unused)
-
     # Build summary line
     parts = []
     for t in ["tool", "resource", "prompt"]:
@@ -75,36 +95,18 @@ async def generate_stats_prompt(
 
     # Build sections
     sections = []
-
-    if type_filter in ("all", "tool"):
-        ts = summary.get("tool", {})
-        sections.append(f"""### 🔧 Tools ({ts.get("count", 0)} tracked, {ts.get("total_calls", 0)} calls)
-
-**Top 5:**
-{format_top(by_type.get("tool", []))}
-
-**Unused:**
-{format_unused(by_type.get("tool", []))}""")
-
-    if type_filter in ("all", "resource"):
-        rs = summary.get("resource", {})
-        sections.append(f"""### 📚 Resources ({rs.get("count", 0)} tracked, {rs.get("total_calls", 0)} calls)
-
-**Top 5:**
-{format_top(by_type.get("resource", []))}
-
-**Unused:**
-{format_unused(by_type.get("resource", []))}""")
-
-    if type_filter in ("all", "prompt"):
-        ps = summary.get("prompt", {})
-        sections.append(f"""### 💬 Prompts ({ps.get("count", 0)} tracked, {ps.get("total_calls", 0)} calls)
+    for kind, heading in _SECTIONS:
+        if type_filter not in ("all", kind):
+            continue
+        counts = summary.get(kind, _EMPTY_SUMMARY)
+        top, unused = _format_section(by_type.get(kind, []))
+        sections.append(f"""### {heading} ({counts["count"]} tracked, {counts["total_calls"]} calls)
 
 **Top 5:**
-{format_top(by_type.get("prompt", []))}
+{top}
 
 **Unused:**
-{format_unused(by_type.get("prompt", []))}""")
+{unused}""")
 
     recs = ""
     if include_recommendations:
@@ -180,15 +182,16 @@ async def handle_stats_prompt(
         GetPromptResult-compatible dictionary
     """
     args = arguments or {}
+    period = args.get("period", "all time")
 
     text = await generate_stats_prompt(
         stat,
-        period=args.get("period", "all time"),
+        period=period,
         type_filter=args.get("type", "all"),
         include_recommendations=args.get("include_recommendations", "yes").lower() != "no",
     )
 
     return {
-        "description": f"MCP usage statistics for {args.get('period', 'all time')}",
+        "description": f"MCP usage statistics for {period}",
         "messages": [{"role": "user", "content": {"type": "text", "text": text}}],
     }
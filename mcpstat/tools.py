@@ -15,6 +15,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     from mcpstat.core import MCPStat
 
 
@@ -94,7 +96,7 @@ class BuiltinToolsHandler:
     Use is_stats_tool() to check if a tool should be handled here.
     """
 
-    __slots__ = ("_names", "prefix", "stat")
+    __slots__ = ("prefix", "stat")
 
     def __init__(self, stat: MCPStat, prefix: str = "get") -> None:
         """Initialize handler.
@@ -105,14 +107,19 @@ class BuiltinToolsHandler:
         """
         self.stat = stat
         self.prefix = prefix
-        self._names = {
-            f"{prefix}_tool_usage_stats",
-            f"{prefix}_tool_catalog",
-        }
+
+    def _lookup(
+        self, name: str
+    ) -> Callable[[BuiltinToolsHandler, dict[str, Any]], Awaitable[dict[str, Any]]] | None:
+        """Return the handler for a tool name under the current prefix."""
+        prefix = self.prefix
+        if not name.startswith(prefix):
+            return None
+        return _HANDLERS.get(name[len(prefix) :])
 
     def is_stats_tool(self, name: str) -> bool:
         """Check if tool name is a built-in stats tool."""
-        return name in self._names
+        return self._lookup(name) is not None
 
     async def handle(self, name: str, arguments: dict[str, Any]) -> dict[str, Any] | None:
         """Handle a built-in tool call.
@@ -124,19 +131,31 @@ class BuiltinToolsHandler:
         Returns:
             Tool result or None if not a stats tool
         """
-        if name == f"{self.prefix}_tool_usage_stats":
-            return await self.stat.get_stats(
-                include_zero=arguments.get("include_zero_usage", True),
-                limit=arguments.get("limit"),
-                type_filter=arguments.get("type_filter"),
-            )
-
-        if name == f"{self.prefix}_tool_catalog":
-            return await self.stat.get_catalog(
-                tags=arguments.get("tags"),
-                query=arguments.get("query"),
-                include_usage=arguments.get("include_usage", True),
-                limit=arguments.get("limit"),
-            )
-
-        return None
+        handler = self._lookup(name)
+        if handler is None:
+            return None
+        return await handler(self, arguments)
+
+    async def _handle_stats(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """Handle the usage stats tool."""
+        return await self.stat.get_stats(
+            include_zero=arguments.get("include_zero_usage", True),
+            limit=arguments.get("limit"),
+            type_filter=arguments.get("type_filter"),
+        )
+
+    async def _handle_catalog(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """Handle the tool catalog tool."""
+        return await self.stat.get_catalog(
+            tags=arguments.get("tags"),
+            query=arguments.get("query"),
+            include_usage=arguments.get("include_usage", True),
+            limit=arguments.get("limit"),
+        )
+
+
+# Built-in tool name suffixes (after the handler's prefix) -> unbound handlers
+_HANDLERS: dict[str, Callable[[BuiltinToolsHandler, dict[str, Any]], Awaitable[dict[str, Any]]]] = {
+    "_tool_usage_stats": BuiltinToolsHandler._handle_stats,
+    "_tool_catalog": BuiltinToolsHandler._handle_catalog,
+}
@@ -8,11 +8,14 @@ SPDX-License-Identifier: MIT
 Utility functions for mcpstat.
 
 Pure functions with no side effects - safe for concurrent use.
+Tag normalization, tag string parsing and short descriptions are
+memoized, since the same catalog is re-synced and re-read on every client
+connection.
 """
 
 from __future__ import annotations
 
-import re
+import functools
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -75,14 +78,20 @@ def normalize_tags(tags: Iterable[str], *, filter_stopwords: bool = False) -> li
         >>> normalize_tags(["convert", "to", "celsius"], filter_stopwords=True)
         ['convert', 'celsius']
     """
+    # Cached on the string form, so any (even unhashable) tag value works as
+    # before; a fresh list keeps callers from mutating the cache
+    return list(_normalize_tags(tuple(str(tag) for tag in tags if tag), filter_stopwords))
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_tags(tags: tuple[str, ...], filter_stopwords: bool) -> tuple[str, ...]:
+    """Memoized implementation of normalize_tags()."""
     result: list[str] = []
     seen: set[str] = set()
 
     for tag in tags:
-        if not tag:
-            continue
-        # Collapse whitespace and normalize case
-        normalized = re.sub(r"\s+", " ", str(tag).strip().lower())
+        # Collapse whitespace (split() also strips) and normalize case
+        normalized = " ".join(tag.lower().split())
         if not normalized or normalized in seen:
             continue
         # Filter stopwords if requested (but always keep tags > 3 chars with underscores)
@@ -91,9 +100,10 @@ def normalize_tags(tags: Iterable[str], *, filter_stopwords: bool = False) -> li
         result.append(normalized)
         seen.add(normalized)
 
-    return result
+    return tuple(result)
 
 
+@functools.lru_cache(maxsize=1024)
 def derive_short_description(
     description: str | None,
     fallback_name: str,
@@ -150,9 +160,16 @@ def parse_tags_string(value: str | None) -> list[str]:
     Returns:
         List of non-empty, stripped tags
     """
+    # Cached as a tuple; a fresh list keeps callers from mutating the cache
+    return list(_parse_tags_string(value))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_tags_string(value: str | None) -> tuple[str, ...]:
+    """Memoized implementation of parse_tags_string()."""
     if not value:
-        return []
-    return [t.strip() for t in value.split(",") if t.strip()]
+        return ()
+    return tuple(t.strip() for t in value.split(",") if t.strip())
 
 
 def tags_to_string(tags: list[str]) -> str:
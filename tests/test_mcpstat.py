@@ -8,9 +8,16 @@ SPDX-License-Identifier: MIT
 
 from __future__ import annotations
 
+import asyncio
+import gc
 import os
 import sqlite3
+import subprocess
+import sys
 import tempfile
+import threading
+import time
+import weakref
 from pathlib import Path
 
 import pytest
@@ -26,6 +33,8 @@ from mcpstat import (
     generate_stats_prompt,
     normalize_tags,
 )
+from mcpstat.database import SCHEMA_VERSION, _iso
+from mcpstat.utils import parse_tags_string
 
 # ============================================================================
 # Utils Tests
@@ -50,6 +59,16 @@ class TestNormalizeTags:
     def test_deduplicates(self):
         assert normalize_tags(["a", "A", "a"]) == ["a"]
 
+    def test_returns_fresh_list(self):
+        """Cached results are copied, so callers may mutate them."""
+        first = normalize_tags(["a", "b"])
+        first.append("mutated")
+        assert normalize_tags(["a", "b"]) == ["a", "b"]
+
+    def test_non_string_items(self):
+        """Non-string (even unhashable) tag items are stringified, as before caching."""
+        assert normalize_tags(["a", ["b"], 3, None, 0]) == ["a", "['b']", "3"]
+
     def test_stopword_filtering(self):
         """Test stopword filtering when enabled."""
         tags = ["convert", "to", "celsius", "the", "from"]
@@ -97,6 +116,22 @@ class TestDeriveShortDescription:
         assert result == "No description available."
 
 
+class TestParseTagsString:
+    """Tests for parse_tags_string function."""
+
+    def test_basic(self):
+        """Test splitting and stripping stored tag strings."""
+        assert parse_tags_string("api, weather ,,") == ["api", "weather"]
+        assert parse_tags_string("") == []
+        assert parse_tags_string(None) == []
+
+    def test_returns_fresh_list(self):
+        """Cached results are copied, so callers may mutate them."""
+        first = parse_tags_string("a,b")
+        first.append("mutated")
+        assert parse_tags_string("a,b") == ["a", "b"]
+
+
 # ============================================================================
 # Logger Tests
 # ============================================================================
@@ -124,6 +159,74 @@ class TestMCPStatLogger:
             assert "tool:test_tool|OK" in content
             assert "prompt:test_prompt|FAIL|Error" in content
 
+    def test_enabled_is_plain_attribute(self):
+        """Test that clearing enabled turns log() into a no-op."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "test.log"
+            logger = MCPStatLogger(str(log_file))
+            logger.log("kept", "tool")
+            logger.enabled = False
+            logger.log("skipped", "tool")
+            logger.close()
+
+            content = log_file.read_text()
+            assert "tool:kept|OK" in content
+            assert "skipped" not in content
+
+    def test_background_writer(self):
+        """Test that entries are written without close()."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "test.log"
+            logger = MCPStatLogger(str(log_file), flush_interval=0.01)
+            logger.log("test_tool", "tool")
+
+            deadline = time.monotonic() + 2
+            while "tool:test_tool|OK" not in log_file.read_text():
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            logger.close()
+
+    def test_overflow_policies(self):
+        """Test drop and block overflow policies."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "drop.log"
+            logger = MCPStatLogger(
+                str(log_file), flush_interval=60, max_pending=2, overflow_policy="drop"
+            )
+            for name in ("t1", "t2", "t3"):
+                logger.log(name, "tool")
+            logger.close()
+            assert "tool:t1|" not in log_file.read_text()
+            assert len(log_file.read_text().splitlines()) == 2
+
+            log_file = Path(tmp_dir) / "block.log"
+            logger = MCPStatLogger(str(log_file), flush_interval=60, max_pending=2)
+            for name in ("t1", "t2", "t3"):
+                logger.log(name, "tool")
+            # Reaching max_pending writes the backlog on the calling thread
+            assert len(log_file.read_text().splitlines()) == 2
+            logger.close()
+            assert len(log_file.read_text().splitlines()) == 3
+
+    def test_abandoned_logger_is_drained(self):
+        """Test that a collected logger writes pending entries and is not kept alive."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "test.log"
+            logger = MCPStatLogger(str(log_file), flush_interval=60)
+            logger.log("test_tool", "tool")
+            ref = weakref.ref(logger)
+
+            del logger
+            gc.collect()
+
+            assert ref() is None
+            assert "tool:test_tool|OK" in log_file.read_text()
+
+    def test_logger_name_is_deprecated(self):
+        with pytest.warns(DeprecationWarning, match="logger_name"):
+            logger = MCPStatLogger(None, logger_name="custom")
+        logger.close()
+
     def test_creates_directory(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
             log_file = Path(tmp_dir) / "nested" / "dir" / "test.log"
@@ -132,6 +235,25 @@ class TestMCPStatLogger:
             logger.close()
             assert log_file.exists()
 
+    def test_opens_file_on_first_log(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "nested" / "test.log"
+            logger = MCPStatLogger(str(log_file))
+            assert not log_file.parent.exists()
+            logger.log("test", "tool")
+            assert log_file.exists()
+            logger.close()
+
+    def test_unwritable_path_disables_logging(self, capsys):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            blocker = Path(tmp_dir) / "file"
+            blocker.write_text("")
+            logger = MCPStatLogger(str(blocker / "test.log"))
+            logger.log("test", "tool")  # Should not raise
+            assert not logger.enabled
+            logger.close()
+            assert "[mcpstat] File logging disabled" in capsys.readouterr().err
+
 
 # ============================================================================
 # Database Tests
@@ -144,6 +266,7 @@ def db_fixture():
     tmp_dir = tempfile.TemporaryDirectory()
     db = MCPStatDatabase(str(Path(tmp_dir.name) / "test.sqlite"))
     yield db
+    db.close()
     tmp_dir.cleanup()
 
 
@@ -161,6 +284,229 @@ class TestMCPStatDatabase:
         assert stats["total_calls"] == 3
         assert stats["tracked_count"] == 2
 
+    @pytest.mark.asyncio
+    async def test_record_many_coalesces(self, db_fixture):
+        """Test that record_many() matches individual records per name."""
+        db = db_fixture
+        await db.record("tool1", "tool", duration_ms=50)
+        await db.record_many(
+            [
+                ("tool1", "tool", 1_700_000_000.0, 700, None, None, 20),
+                ("tool2", "prompt", 1_700_000_001.0, None, 10, 5, None),
+                ("tool1", "tool", 1_700_000_002.0, None, 3, None, 80),
+            ]
+        )
+
+        stats = await db.get_stats()
+        by_name = {s["name"]: s for s in stats["stats"]}
+        tool1 = by_name["tool1"]
+        assert tool1["call_count"] == 3
+        assert tool1["estimated_tokens"] == 200
+        assert tool1["total_input_tokens"] == 3
+        assert tool1["total_duration_ms"] == 150
+        assert tool1["min_duration_ms"] == 20
+        assert tool1["max_duration_ms"] == 80
+        assert tool1["last_accessed"] == "2023-11-14T22:13:22+00:00"
+        assert by_name["tool2"]["type"] == "prompt"
+        assert by_name["tool2"]["total_output_tokens"] == 5
+
+    def test_default_pragmas(self, db_fixture):
+        """Test that connections apply the default PRAGMAs."""
+        with db_fixture._connect() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+    @pytest.mark.asyncio
+    async def test_connection_is_reused(self, db_fixture):
+        """Test that operations share one connection until close()."""
+        await db_fixture.record("tool1", "tool")
+        with db_fixture._connect() as first, db_fixture._connect() as second:
+            assert first is second
+
+        db_fixture.close()
+        db_fixture.close()  # Safe to call twice
+        with db_fixture._connect() as reopened:
+            assert reopened is not first
+        stats = await db_fixture.get_stats()
+        assert stats["total_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_operations_run_on_database_thread(self, db_fixture):
+        """Test that async operations run off the event loop thread."""
+        await db_fixture.record("tool1", "tool")
+        name = await db_fixture._run(lambda: threading.current_thread().name)
+        assert name.startswith("mcpstat-db")
+
+        db_fixture.close()
+        assert db_fixture._executor is None
+        stats = await db_fixture.get_stats()  # Restarts the thread
+        assert stats["total_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_read_cache(self, db_fixture):
+        """Test that query results are reused until this manager writes."""
+        await db_fixture.record("tool1", "tool")
+        first = await db_fixture.get_stats()
+        first["stats"][0]["tags"].append("mutated")
+
+        # A write that bypasses the manager on its own connection is not
+        # visible while the result is cached
+        with db_fixture._connect() as conn:
+            conn.execute("UPDATE mcpstat_usage SET call_count = 10")
+            conn.commit()
+        second = await db_fixture.get_stats()
+        assert second["total_calls"] == 1
+        assert second["stats"][0]["tags"] == []
+
+        # Writes through the manager invalidate the cache
+        await db_fixture.record("tool1", "tool")
+        assert (await db_fixture.get_stats())["total_calls"] == 11
+
+        db_fixture.read_cache_ttl = 0
+        with db_fixture._connect() as conn:
+            conn.execute("UPDATE mcpstat_usage SET call_count = 20")
+            conn.commit()
+        assert (await db_fixture.get_stats())["total_calls"] == 20
+
+    @pytest.mark.asyncio
+    async def test_read_cache_sees_other_connections(self, db_fixture):
+        """Test that commits from another connection invalidate cached results."""
+        await db_fixture.record("tool1", "tool")
+        assert (await db_fixture.get_stats())["total_calls"] == 1
+
+        other = MCPStatDatabase(db_fixture.db_path)
+        try:
+            await other.record("tool1", "tool")
+        finally:
+            other.close()
+        assert (await db_fixture.get_stats())["total_calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_latest_access_covers_returned_rows(self, db_fixture):
+        """Test that latest_access is the newest access among returned rows."""
+        await db_fixture.record_many(
+            [
+                ("busy", "tool", 100.0, None, None, None, None),
+                ("busy", "tool", 100.0, None, None, None, None),
+                ("recent", "tool", 200.0, None, None, None, None),
+            ]
+        )
+        stats = await db_fixture.get_stats()
+        assert stats["stats"][0]["name"] == "busy"
+        assert stats["latest_access"] == "1970-01-01T00:03:20+00:00"
+
+        top = await db_fixture.get_stats(limit=1)
+        assert top["latest_access"] == "1970-01-01T00:01:40+00:00"
+
+    def test_iso_timestamps(self):
+        """Test cached ISO formatting across and within seconds."""
+        assert _iso(0.0) == "1970-01-01T00:00:00+00:00"
+        assert _iso(0.9) == "1970-01-01T00:00:00+00:00"
+        assert _iso(86400.25) == "1970-01-02T00:00:00+00:00"
+        assert _iso(0.5) == "1970-01-01T00:00:00+00:00"
+
+    def test_stats_queries_use_indexes(self, db_fixture):
+        """Test that get_stats orderings are served by an index, not a sort."""
+        db_fixture._ensure_schema()
+        order = "ORDER BY u.call_count DESC, u.last_accessed DESC"
+        with db_fixture._connect() as conn:
+            for where, params in (("", ()), ("WHERE u.type = ?", ("tool",))):
+                plan = " ".join(
+                    row[3]
+                    for row in conn.execute(
+                        f"EXPLAIN QUERY PLAN SELECT u.name FROM mcpstat_usage u "
+                        f"LEFT JOIN mcpstat_metadata m ON u.name = m.name {where} {order}",
+                        params,
+                    )
+                )
+                assert "idx_mcpstat_usage" in plan
+                assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.asyncio
+    async def test_planner_statistics(self, db_fixture):
+        """Test that the schema is analyzed and close() keeps statistics fresh."""
+        db_fixture._ensure_schema()
+        with db_fixture._connect() as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert "sqlite_stat1" in tables
+
+        db_fixture.record_many_sync(
+            [(f"tool{i}", "tool", 0.0, None, None, None, None) for i in range(50)]
+        )
+        await db_fixture.get_stats(type_filter="tool")
+        db_fixture.close()
+        with sqlite3.connect(db_fixture.db_path) as conn:
+            analyzed = {row[0] for row in conn.execute("SELECT tbl FROM sqlite_stat1")}
+        conn.close()
+        assert "mcpstat_usage" in analyzed
+
+    def test_schema_created_once_across_threads(self, db_fixture, monkeypatch):
+        """Test that concurrent first calls create the schema only once."""
+        calls = []
+        create = MCPStatDatabase._create_schema
+
+        def counting_create(self):
+            calls.append(threading.get_ident())
+            time.sleep(0.05)
+            create(self)
+
+        monkeypatch.setattr(MCPStatDatabase, "_create_schema", counting_create)
+        barrier = threading.Barrier(4)
+
+        def first_call():
+            barrier.wait()
+            db_fixture._ensure_schema()
+
+        threads = [threading.Thread(target=first_call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_begin_immediate(self, db_fixture):
+        """Test that write transactions take the write lock up front."""
+        db_fixture._ensure_schema()
+        statements: list[str] = []
+        with db_fixture._connect() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            await db_fixture.record("tool1", "tool")
+            assert [s for s in statements if s.startswith("BEGIN")] == ["BEGIN IMMEDIATE"]
+
+            # sync_metadata reads the existing rows inside its transaction
+            statements.clear()
+            await db_fixture.sync_metadata([{"name": "tool1", "tags": ["a"]}])
+            assert statements[0] == "BEGIN IMMEDIATE"
+            assert "FROM mcpstat_metadata" in statements[1]
+        finally:
+            with db_fixture._connect() as conn:
+                conn.set_trace_callback(None)
+
+    def test_connect_rolls_back_on_error(self, db_fixture):
+        """Test that a failed block does not leave its transaction open."""
+        db_fixture._ensure_schema()
+        with pytest.raises(RuntimeError), db_fixture._connect() as conn:
+            conn.execute("INSERT INTO mcpstat_metadata (name, updated_at) VALUES ('orphan', 'now')")
+            raise RuntimeError("boom")
+
+        with db_fixture._connect() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM mcpstat_metadata").fetchone()[0] == 0
+
+    def test_pragma_overrides(self):
+        """Test PRAGMA overrides and validation."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = str(Path(tmp_dir) / "test.sqlite")
+            db = MCPStatDatabase(db_path, pragmas={"synchronous": "FULL"})
+            with db._connect() as conn:
+                assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+
+            with pytest.raises(ValueError, match="Invalid SQLite PRAGMA"):
+                MCPStatDatabase(db_path, pragmas={"synchronous": "OFF; DROP TABLE x"})
+
     @pytest.mark.asyncio
     async def test_record_with_db_in_current_dir(self):
         """Test database in current directory (no parent path)."""
@@ -212,6 +558,25 @@ class TestMCPStatDatabase:
         stats = await db.get_stats(include_zero=False)
         assert stats["tracked_count"] == 1
 
+    @pytest.mark.asyncio
+    async def test_get_stats_without_metadata(self, db_fixture):
+        db = db_fixture
+        await db.sync_metadata([{"name": "tool1", "tags": ["a"], "short_description": "T1"}])
+        await db.record("tool1", "tool", duration_ms=10)
+
+        full = await db.get_stats()
+        bare = await db.get_stats(include_metadata=False)
+        entry = bare["stats"][0]
+        assert entry["tags"] is None
+        assert entry["short_description"] is None
+        assert entry["full_description"] is None
+        # Usage fields and totals are unaffected
+        skip = {"tags", "short_description", "full_description"}
+        assert {k: v for k, v in entry.items() if k not in skip} == {
+            k: v for k, v in full["stats"][0].items() if k not in skip
+        }
+        assert bare["total_calls"] == full["total_calls"] == 1
+
     @pytest.mark.asyncio
     async def test_get_by_type(self, db_fixture):
         db = db_fixture
@@ -225,6 +590,24 @@ class TestMCPStatDatabase:
         assert len(result["by_type"]["prompt"]) == 1
         assert len(result["by_type"]["resource"]) == 1
 
+    @pytest.mark.asyncio
+    async def test_get_by_type_top_n(self, db_fixture):
+        db = db_fixture
+        for i in range(4):
+            for _ in range(i + 1):
+                await db.record(f"tool{i}", "tool")
+        await db.record("prompt1", "prompt")
+
+        result = await db.get_by_type(top_n=2)
+        assert [e["name"] for e in result["by_type"]["tool"]] == ["tool3", "tool2"]
+        assert [e["name"] for e in result["by_type"]["prompt"]] == ["prompt1"]
+        # Totals still cover every entry
+        assert result["total_items"] == 5
+        assert result["total_calls"] == 11
+        assert result["summary"]["tool"] == {"count": 4, "total_calls": 10}
+
+        assert await db.get_type_summary() == result["summary"]
+
     @pytest.mark.asyncio
     async def test_metadata_sync(self, db_fixture):
         db = db_fixture
@@ -250,6 +633,25 @@ class TestMCPStatDatabase:
         catalog = await db.get_catalog()
         assert catalog["total_tracked"] == 1
 
+    @pytest.mark.skipif(
+        not hasattr(sqlite3.Connection, "setlimit"), reason="Connection.setlimit needs 3.11+"
+    )
+    @pytest.mark.asyncio
+    async def test_orphan_cleanup_beyond_parameter_limit(self, db_fixture):
+        db = db_fixture
+        tools = [{"name": f"tool{i}", "tags": ["a"]} for i in range(1200)]
+        await db.sync_metadata(tools)
+        # Lower the host-parameter limit so a placeholder per orphan would fail
+        with db._connect() as conn:
+            conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        await db.sync_metadata(tools[:1], cleanup_orphans=True)
+
+        catalog = await db.get_catalog()
+        assert catalog["total_tracked"] == 1
+        # The temp table is dropped again; a second cleanup can recreate it
+        await db.sync_metadata([], cleanup_orphans=True)
+        assert (await db.get_catalog())["total_tracked"] == 0
+
     @pytest.mark.asyncio
     async def test_catalog_filtering(self, db_fixture):
         db = db_fixture
@@ -526,7 +928,7 @@ class TestLatencyTracking:
 
 
 class TestSchemaMigration:
-    """Tests for schema migration from v1 to v3."""
+    """Tests for schema migration from v1 to v4."""
 
     @pytest.mark.asyncio
     async def test_migration_v1_to_v3(self):
@@ -639,6 +1041,67 @@ class TestSchemaMigration:
             assert tool_stat2["min_duration_ms"] == 75
             assert tool_stat2["max_duration_ms"] == 75
 
+    def test_current_user_version_skips_migrations(self):
+        """Test that a database at SCHEMA_VERSION is not re-checked."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = str(Path(tmp_dir) / "test.sqlite")
+            db = MCPStatDatabase(db_path)
+            db._ensure_schema()
+            db.close()
+
+            # Drop a migrated object; a current user_version must not recreate it
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("DROP TABLE mcpstat_metadata_tags")
+            conn.close()
+
+            db = MCPStatDatabase(db_path)
+            try:
+                db._ensure_schema()
+                with db._connect() as conn:
+                    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+                assert "mcpstat_metadata_tags" not in tables
+            finally:
+                db.close()
+
+    @pytest.mark.asyncio
+    async def test_migration_v3_to_v4(self):
+        """Test that v3 metadata tags are backfilled into the tag table."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = str(Path(tmp_dir) / "test.sqlite")
+
+            conn = sqlite3.connect(db_path)
+            conn.executescript("""
+                CREATE TABLE mcpstat_metadata (
+                    name TEXT PRIMARY KEY,
+                    tags TEXT NOT NULL DEFAULT '',
+                    short_description TEXT NOT NULL DEFAULT '',
+                    full_description TEXT DEFAULT '',
+                    schema_version INTEGER NOT NULL DEFAULT 3,
+                    updated_at TEXT NOT NULL
+                );
+
+                INSERT INTO mcpstat_metadata (name, tags, updated_at)
+                VALUES ('weather', 'api, weather', '2024-01-01'), ('news', 'api,news', '2024-01-01');
+            """)
+            conn.close()
+
+            db = MCPStatDatabase(db_path)
+            try:
+                catalog = await db.get_catalog(tags=["weather"])
+                assert [r["name"] for r in catalog["results"]] == ["weather"]
+                assert catalog["all_tags"] == ["api", "news", "weather"]
+                with db._connect() as conn:
+                    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+                # Rewritten and removed entries keep the tag table in sync
+                await db.update_metadata("news", tags=["world"], short_description="")
+                await db.sync_metadata([{"name": "news", "tags": ["world"]}])
+                catalog = await db.get_catalog(tags=["api"])
+                assert catalog["matched"] == 0
+                assert catalog["all_tags"] == ["world"]
+            finally:
+                db.close()
+
 
 # ============================================================================
 # Core Tests
@@ -768,6 +1231,28 @@ class TestMCPStat:
         assert stats["total_calls"] == 1
         assert stats["stats"][0]["name"] == "failing_tool"
 
+    @pytest.mark.asyncio
+    async def test_track_decorator_logs_error_message(self):
+        """Test that the exception message reaches the file log when enabled."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_path = Path(tmp_dir) / "usage.log"
+            stat = MCPStat(
+                "test",
+                db_path=str(Path(tmp_dir) / "test.sqlite"),
+                log_path=str(log_path),
+                log_enabled=True,
+            )
+
+            @stat.track
+            async def failing_tool(_name: str, _arguments: dict):
+                raise ValueError("Intentional error")
+
+            with pytest.raises(ValueError):
+                await failing_tool("failing_tool", {})
+            stat.close()
+
+            assert "tool:failing_tool|FAIL|Intentional error" in log_path.read_text()
+
     @pytest.mark.asyncio
     async def test_track_decorator_fallback_name(self, stat_fixture):
         """Test @stat.track uses function name when no name arg provided."""
@@ -783,6 +1268,58 @@ class TestMCPStat:
         assert stats["total_calls"] == 1
         assert stats["stats"][0]["name"] == "my_custom_function"
 
+    @pytest.mark.asyncio
+    async def test_track_decorator_skips_unknown_tools(self, stat_fixture):
+        """Test @stat.track only counts calls to tools outside the known set."""
+        stat = stat_fixture
+        stat.skip_unknown_tools = True
+
+        class MockTool:
+            name = "known_tool"
+            description = "A known tool"
+
+        await stat.sync_tools([MockTool()])
+
+        @stat.track
+        async def handle_tool(name: str, _arguments: dict):
+            return name
+
+        assert await handle_tool("known_tool", {}) == "known_tool"
+        assert await handle_tool("bogus_tool", {}) == "bogus_tool"
+        assert await handle_tool("bogus_tool", {}) == "bogus_tool"
+
+        stats = await stat.get_stats()
+        assert stats["total_calls"] == 1
+        assert stats["stats"][0]["name"] == "known_tool"
+        assert stat.unknown_tool_calls == 2
+
+        # Clearing the known set tracks every name again
+        stat.set_known_tools([])
+        await handle_tool("bogus_tool", {})
+        stats = await stat.get_stats()
+        assert stats["total_calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_track_decorator_records_unsynced_tools_by_default(self, stat_fixture):
+        """Test that syncing a partial tool list still records every call."""
+        stat = stat_fixture
+
+        class MockTool:
+            name = "known_tool"
+            description = "A known tool"
+
+        await stat.sync_tools([MockTool()])
+
+        @stat.track
+        async def handle_tool(name: str, _arguments: dict):
+            return name
+
+        await handle_tool("dynamic_tool", {})
+
+        stats = await stat.get_stats()
+        assert [s["name"] for s in stats["stats"] if s["call_count"]] == ["dynamic_tool"]
+        assert stat.unknown_tool_calls == 0
+
     @pytest.mark.asyncio
     async def test_tracking_context_manager(self, stat_fixture):
         """Test async with stat.tracking() context manager."""
@@ -841,6 +1378,26 @@ class TestMCPStat:
         catalog = await stat.get_catalog()
         assert "custom" in catalog["results"][0]["tags"]
 
+    @pytest.mark.asyncio
+    async def test_sync_prompts_updates_and_keeps_others(self, stat_fixture):
+        """Test re-syncing prompts updates changed entries and never removes others."""
+        stat = stat_fixture
+        await stat.register_metadata("some_tool", tags=["tool"], short_description="Tool")
+
+        class MockPrompt:
+            def __init__(self, description: str):
+                self.name = "test_prompt"
+                self.description = description
+
+        await stat.sync_prompts([MockPrompt("First")])
+        # Repeated names: the last entry wins
+        await stat.sync_prompts([MockPrompt("Second"), MockPrompt("Third")])
+
+        catalog = await stat.get_catalog()
+        by_name = {r["name"]: r for r in catalog["results"]}
+        assert set(by_name) == {"some_tool", "test_prompt"}
+        assert by_name["test_prompt"]["full_description"] == "Third"
+
     @pytest.mark.asyncio
     async def test_sync_resources(self, stat_fixture):
         """Test sync_resources method."""
@@ -883,6 +1440,127 @@ class TestMCPStat:
         catalog = await stat.get_catalog()
         assert "data" in catalog["results"][0]["tags"]
 
+    @pytest.mark.asyncio
+    async def test_sync_all(self, stat_fixture):
+        """Test sync_all registers every primitive and cleans up stale entries."""
+        stat = stat_fixture
+
+        class MockItem:
+            def __init__(self, name):
+                self.name = name
+                self.description = f"{name} description"
+
+        await stat.register_metadata("stale_tool", tags=["old"], short_description="Old")
+        await stat.sync_all(
+            tools=[MockItem("tool_a")],
+            resources=[MockItem("resource_a")],
+            prompts=[MockItem("prompt_a")],
+        )
+
+        catalog = await stat.get_catalog()
+        names = {r["name"] for r in catalog["results"]}
+        assert names == {"tool_a", "resource_a", "prompt_a"}
+
+        # Without tools, nothing is cleaned up
+        await stat.sync_all(prompts=[MockItem("prompt_b")])
+        catalog = await stat.get_catalog()
+        assert len(catalog["results"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_record_is_batched_until_flush(self, stat_fixture):
+        """Test that record() queues writes until flush()."""
+        stat = stat_fixture
+        stat.flush_interval_ms = 60_000
+
+        await stat.record("tool1", "tool", duration_ms=10)
+        await stat.record("tool1", "tool", duration_ms=30)
+        assert len(stat._pending) == 2
+
+        await stat.flush()
+        assert not stat._pending
+
+        stats = await stat._db.get_stats()
+        assert stats["stats"][0]["call_count"] == 2
+        assert stats["stats"][0]["min_duration_ms"] == 10
+        assert stats["stats"][0]["max_duration_ms"] == 30
+
+    @pytest.mark.asyncio
+    async def test_flush_threshold(self, stat_fixture):
+        """Test that reaching flush_threshold writes immediately."""
+        stat = stat_fixture
+        stat.flush_interval_ms = 60_000
+        stat.flush_threshold = 3
+
+        for _ in range(3):
+            await stat.record("tool1", "tool")
+
+        assert not stat._pending
+        stats = await stat._db.get_stats()
+        assert stats["total_calls"] == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_interval(self, stat_fixture):
+        """Test that pending records are flushed in the background."""
+        stat = stat_fixture
+        stat.flush_interval_ms = 1
+
+        await stat.record("tool1", "tool")
+        await asyncio.sleep(0.05)
+
+        assert not stat._pending
+        stats = await stat._db.get_stats()
+        assert stats["total_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_close_writes_pending(self, stat_fixture):
+        """Test that close() writes pending records synchronously."""
+        stat = stat_fixture
+        stat.flush_interval_ms = 60_000
+
+        await stat.record("tool1", "tool")
+        stat.close()
+
+        stats = await stat._db.get_stats()
+        assert stats["total_calls"] == 1
+
+    def test_loop_shutdown_writes_pending(self):
+        """Test that records queued when asyncio.run() returns are written."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = str(Path(tmp_dir) / "test.sqlite")
+            stat = MCPStat("test", db_path=db_path, flush_interval_ms=60_000)
+
+            @stat.track
+            async def handler(_name: str, _arguments: dict) -> str:
+                return "ok"
+
+            async def main() -> None:
+                await handler("tool_a", {})
+                await stat.record("tool_b", "tool")
+
+            asyncio.run(main())
+
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute("SELECT name FROM mcpstat_usage ORDER BY name").fetchall()
+            assert rows == [("tool_a",), ("tool_b",)]
+            stat.close()
+
+    def test_interpreter_exit_writes_pending(self):
+        """Test that records still queued at interpreter exit are written."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = str(Path(tmp_dir) / "test.sqlite")
+            script = (
+                "import asyncio\n"
+                "from mcpstat import MCPStat\n"
+                f"stat = MCPStat('test', db_path={db_path!r}, flush_interval_ms=60_000)\n"
+                "loop = asyncio.new_event_loop()\n"
+                "loop.run_until_complete(stat.record('tool_a', 'tool'))\n"
+            )
+            subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+
+            with sqlite3.connect(db_path) as conn:
+                rows = conn.execute("SELECT name FROM mcpstat_usage").fetchall()
+            assert rows == [("tool_a",)]
+
     @pytest.mark.asyncio
     async def test_record_with_failure(self, stat_fixture):
         """Test recording failed invocations."""
@@ -1163,6 +1841,17 @@ class TestBuiltinToolsHandler:
         assert handler.is_stats_tool("get_tool_catalog")
         assert not handler.is_stats_tool("other_tool")
 
+    @pytest.mark.asyncio
+    async def test_prefix_change_updates_dispatch(self, stat_fixture):
+        """Test that changing prefix after construction changes the handled names."""
+        handler = BuiltinToolsHandler(stat_fixture, prefix="get")
+        handler.prefix = "fetch"
+
+        assert handler.is_stats_tool("fetch_tool_catalog")
+        assert not handler.is_stats_tool("get_tool_catalog")
+        assert await handler.handle("get_tool_catalog", {}) is None
+        assert await handler.handle("fetch_tool_catalog", {}) is not None
+
     @pytest.mark.asyncio
     async def test_handle_usage_stats(self, stat_fixture):
         """Test handling get_tool_usage_stats."""
@@ -1220,6 +1909,7 @@ class TestCoverageGaps:
         stat._db._initialized = False
 
         await stat.record("tool1", "tool")
+        await stat.flush()
 
         captured = capsys.readouterr()
         assert "[mcpstat] SQLite tracking failed" in captured.err
@@ -1238,6 +1928,27 @@ class TestCoverageGaps:
         captured = capsys.readouterr()
         assert "[mcpstat] Token reporting failed" in captured.err
 
+    @pytest.mark.asyncio
+    async def test_db_failures_are_rate_limited(self, stat_fixture, capsys, tmp_path):
+        """Test that repeated tracking failures print one stderr line per interval."""
+        stat = stat_fixture
+
+        # A regular file as the parent directory makes every connect fail
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        stat._db.db_path = str(blocker / "impossible.sqlite")
+        stat._db._initialized = False
+
+        for _ in range(3):
+            await stat.record("tool1", "tool")
+            await stat.flush()
+        assert capsys.readouterr().err.count("[mcpstat]") == 1
+
+        stat._errors_reported_at = float("-inf")
+        await stat.record("tool1", "tool")
+        await stat.flush()
+        assert "(2 similar errors suppressed)" in capsys.readouterr().err
+
     @pytest.mark.asyncio
     async def test_track_decorator_non_string_first_arg(self, stat_fixture):
         """Test @stat.track falls back to fn.__name__ when first arg isn't a string."""
@@ -1354,24 +2065,22 @@ class TestCoverageGaps:
             assert "(All have been used)" in text
             stat.close()
 
-    def test_logger_reinit_no_duplicate_handlers(self):
-        """Test that re-initializing logger with same name doesn't duplicate handlers."""
+    def test_two_loggers_same_file(self):
+        """Test that two loggers on one file both append without duplicates."""
         with tempfile.TemporaryDirectory() as tmp_dir:
-            log_file = str(Path(tmp_dir) / "test.log")
-            logger_name = "mcpstat.test_reinit"
-
-            logger1 = MCPStatLogger(log_file, logger_name=logger_name)
-            handler_count_1 = len(logger1._logger.handlers) if logger1._logger else 0
-
-            # Re-initialize with same logger name - should not add another handler
-            logger2 = MCPStatLogger(log_file, logger_name=logger_name)
-            handler_count_2 = len(logger2._logger.handlers) if logger2._logger else 0
-
-            assert handler_count_1 == handler_count_2 == 1
+            log_file = Path(tmp_dir) / "test.log"
 
+            logger1 = MCPStatLogger(str(log_file))
+            logger2 = MCPStatLogger(str(log_file))
+            logger1.log("tool_a", "tool")
+            logger2.log("tool_b", "tool")
             logger1.close()
             logger2.close()
 
+            lines = log_file.read_text().splitlines()
+            assert len(lines) == 2
+            assert {line.split("|")[1] for line in lines} == {"tool:tool_a", "tool:tool_b"}
+
     @pytest.mark.asyncio
     async def test_get_stats_with_zero_count_row(self):
         """Test get_stats when mcpstat_usage has a row with call_count=0."""
@@ -1407,6 +2116,7 @@ class TestCoverageGaps:
 
             # Record one tool to create a usage row
             await stat.record("used_tool", "tool")
+            await stat.flush()
 
             # Insert a zero-count row to simulate an unused tool in get_by_type
             conn = sqlite3.connect(db_path)